@@ -1,3 +1,4 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
 
 from recipes.models import Ingredient, Recipe, Tag
@@ -6,7 +7,14 @@ from recipes.models import Ingredient, Recipe, Tag
 class RecipeFilter(filters.FilterSet):
     """Фильтр для рецептов по тегам и автору."""
 
-    tags = filters.AllValuesMultipleFilter(field_name="tags__slug")
+    # Выбор по таблице тегов: AllValuesMultipleFilter строил варианты
+    # запросом DISTINCT по всем рецептам при каждом обращении к списку.
+    tags = filters.ModelMultipleChoiceFilter(
+        field_name="tags__slug",
+        to_field_name="slug",
+        queryset=Tag.objects.all(),
+        method="filter_tags",
+    )
     author = filters.NumberFilter(field_name="author__id")
     is_favorited = filters.BooleanFilter(method="filter_is_favorited")
     is_in_shopping_cart = filters.BooleanFilter(
@@ -17,6 +25,23 @@ class RecipeFilter(filters.FilterSet):
         model = Recipe
         fields = ("tags", "author")
 
+    def filter_tags(self, queryset, name, value):
+        """
+        Рецепты хотя бы с одним из тегов.
+
+        EXISTS вместо JOIN с DISTINCT: лента по тегу читается по индексу
+        pub_date без сортировки всей выборки.
+        """
+        if not value:
+            return queryset
+        return queryset.filter(
+            Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe_id=OuterRef("pk"), tag__in=value
+                )
+            )
+        )
+
     def filter_is_favorited(self, queryset, name, value):
         user = getattr(self.request, "user", None)
         if user is None or user.is_anonymous:
@@ -0,0 +1,136 @@
+from core.instrumentation import timed
+from core.media import media_url
+from recipes.documents import build_recipe_documents, store_recipe_documents
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription
+
+
+class RowMapper:
+    """Преобразование списка значений в словарь с заданными ключами."""
+
+    __slots__ = ("keys",)
+
+    def __init__(self, *keys):
+        self.keys = keys
+
+    def __call__(self, row):
+        return dict(zip(self.keys, row))
+
+
+TAG_ROW = RowMapper("id", "name", "slug")
+INGREDIENT_ROW = RowMapper("id", "name", "measurement_unit", "amount")
+
+
+class RecipeReader:
+    """
+    Чтение рецептов для list/retrieve без дерева полей DRF.
+
+    Основа представления берется из Recipe.document одним запросом,
+    поверх накладываются is_favorited, is_in_shopping_cart и
+    is_subscribed текущего пользователя. Результат совпадает с
+    RecipeSerializer.
+    """
+
+    __slots__ = ("request", "user")
+
+    def __init__(self, request):
+        self.request = request
+        user = request.user
+        self.user = user if user.is_authenticated else None
+
+    @timed("serialize")
+    def read(self, recipe_ids):
+        """Представления рецептов в порядке переданных идентификаторов."""
+        recipe_ids = list(recipe_ids)
+        if not recipe_ids:
+            return []
+
+        documents = self._documents(recipe_ids)
+        favorited = self._user_recipes(Favorite, recipe_ids)
+        in_shopping_cart = self._user_recipes(ShoppingCart, recipe_ids)
+        subscribed = self._subscribed(
+            {document["author"][0] for document in documents.values()}
+        )
+
+        authors = {}
+        recipes = []
+        for recipe_id in recipe_ids:
+            document = documents.get(recipe_id)
+            if document is None:
+                continue
+            author_id = document["author"][0]
+            if author_id not in authors:
+                authors[author_id] = self._author(
+                    document["author"], author_id in subscribed
+                )
+            recipes.append({
+                "id": recipe_id,
+                "tags": list(map(TAG_ROW, document["tags"])),
+                "author": authors[author_id],
+                "ingredients": list(
+                    map(INGREDIENT_ROW, document["ingredients"])
+                ),
+                "is_favorited": recipe_id in favorited,
+                "is_in_shopping_cart": recipe_id in in_shopping_cart,
+                "name": document["name"],
+                "image": self._file_url(document["image"]),
+                "text": document["text"],
+                "cooking_time": document["cooking_time"],
+            })
+        return recipes
+
+    @staticmethod
+    def _documents(recipe_ids):
+        """Документы рецептов; отсутствующие собираются и сохраняются."""
+        documents = dict(
+            Recipe.objects.filter(pk__in=recipe_ids).values_list(
+                "id", "document"
+            )
+        )
+        missing = [
+            recipe_id
+            for recipe_id, document in documents.items()
+            if not document
+        ]
+        if missing:
+            built = build_recipe_documents(missing)
+            store_recipe_documents(built)
+            documents.update(built)
+        return documents
+
+    def _author(self, row, is_subscribed):
+        """Автор в формате UserSerializer."""
+        author_id, email, username, first_name, last_name, avatar = row
+        return {
+            "email": email,
+            "id": author_id,
+            "username": username,
+            "first_name": first_name,
+            "last_name": last_name,
+            "is_subscribed": is_subscribed,
+            "avatar": self._file_url(avatar),
+        }
+
+    def _subscribed(self, author_ids):
+        """Идентификаторы авторов, на которых подписан пользователь."""
+        if self.user is None:
+            return set()
+        return set(
+            Subscription.objects.filter(
+                user=self.user, author_id__in=author_ids
+            ).values_list("author_id", flat=True)
+        )
+
+    def _user_recipes(self, model, recipe_ids):
+        """Идентификаторы рецептов из избранного или списка покупок."""
+        if self.user is None:
+            return set()
+        return set(
+            model.objects.filter(
+                user=self.user, recipe_id__in=recipe_ids
+            ).values_list("recipe_id", flat=True)
+        )
+
+    def _file_url(self, name):
+        """Абсолютный URL файла, как у MediaImageField."""
+        return media_url(name, self.request)
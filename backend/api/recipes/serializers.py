@@ -1,7 +1,10 @@
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 
 from api.users.serializers import UserSerializer
-from core.fields import Base64ImageField
+from core.fields import Base64ImageField, MediaImageField
+from recipes.documents import refresh_recipe_documents
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -67,7 +70,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     )
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
-    image = serializers.ImageField(read_only=True)
+    image = MediaImageField(read_only=True)
 
     class Meta:
         model = Recipe
@@ -234,6 +237,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             for ingredient_data in ingredients
         ])
 
+    @transaction.atomic
     def create(self, validated_data):
         """Создание нового рецепта."""
         ingredients = validated_data.pop("ingredients")
@@ -243,8 +247,10 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         recipe = Recipe.objects.create(author=request.user, **validated_data)
         recipe.tags.set(tags)
         self.create_ingredients(recipe, ingredients)
+        refresh_recipe_documents([recipe.pk])
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Обновление рецепта."""
         ingredients = validated_data.pop("ingredients", None)
@@ -254,16 +260,22 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         instance.tags.set(tags)
         instance.ingredient_amounts.all().delete()
         self.create_ingredients(instance, ingredients)
+        refresh_recipe_documents([instance.pk])
         return instance
 
     def to_representation(self, instance):
         """Возврат сериализованного рецепта после создания."""
+        prefetch_related_objects(
+            [instance], "tags", "ingredient_amounts__ingredient"
+        )
         return RecipeSerializer(instance, context=self.context).data
 
 
 class RecipeMinifiedSerializer(serializers.ModelSerializer):
     """Упрощенный сериализатор рецепта."""
 
+    image = MediaImageField(read_only=True)
+
     class Meta:
         model = Recipe
         fields = (
@@ -1,3 +1,4 @@
+from django.db.models import Count, Max
 from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
@@ -10,11 +11,15 @@ from rest_framework.permissions import (
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.cache import cache_anonymous_response
+from core.conditional import conditional_response, relations_version
+from core.localcache import ingredients_cache, short_links_cache, tags_cache
 from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
 from recipes.utils import generate_shopping_list
 
 from .filters import IngredientFilter, RecipeFilter
 from .permissions import IsAuthorOrReadOnly
+from .readers import RecipeReader
 from .serializers import (
     FavoriteCreateSerializer,
     IngredientSerializer,
@@ -32,6 +37,17 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = TagSerializer
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        """Список тегов из кэша процесса."""
+        return Response(
+            tags_cache.get_or_set(
+                "list",
+                lambda: self.get_serializer(
+                    self.get_queryset(), many=True
+                ).data,
+            )
+        )
+
 
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet для работы с ингредиентами."""
@@ -43,6 +59,27 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ["^name"]
     filterset_class = IngredientFilter
 
+    def list(self, request, *args, **kwargs):
+        """
+        Поиск ингредиентов; результаты по параметрам кэшируются.
+
+        Поиск не зависит от регистра, поэтому и ключ в нижнем регистре.
+        """
+        key = tuple(
+            sorted(
+                (name, tuple(value.lower() for value in values))
+                for name, values in request.query_params.lists()
+            )
+        )
+        return Response(
+            ingredients_cache.get_or_set(
+                key,
+                lambda: self.get_serializer(
+                    self.filter_queryset(self.get_queryset()), many=True
+                ).data,
+            )
+        )
+
 
 class RecipeViewSet(viewsets.ModelViewSet):
     """ViewSet для работы с рецептами."""
@@ -62,6 +99,69 @@ class RecipeViewSet(viewsets.ModelViewSet):
             return RecipeCreateSerializer
         return RecipeSerializer
 
+    def get_queryset(self):
+        """Для чтения данные выбирает RecipeReader, prefetch не нужен."""
+        if self.action in ("list", "retrieve"):
+            return Recipe.objects.all()
+        return super().get_queryset()
+
+    def get_list_state(self):
+        """
+        Число рецептов выборки, даты их изменения и версия отметок
+        пользователя для ETag: один агрегатный запрос.
+
+        Удаление рецепта меняет число, добавление и перенос в выборку —
+        дату изменения. Страницу учитывает адрес запроса в ETag.
+        """
+        state = self.filter_queryset(self.get_queryset()).aggregate(
+            count=Count("id"),
+            updated_at=Max("updated_at"),
+            author_updated_at=Max("author__updated_at"),
+            relations=Max(relations_version(self.request.user)),
+        )
+        updated_at = filter(
+            None, (state["updated_at"], state["author_updated_at"])
+        )
+        return (
+            max(updated_at, default=None), state["count"], state["relations"]
+        )
+
+    def get_object_state(self):
+        """Дата изменения рецепта или его автора для ETag."""
+        state = (
+            Recipe.objects.filter(pk=self.kwargs["pk"])
+            .annotate(relations=relations_version(self.request.user))
+            .values_list("updated_at", "author__updated_at", "relations")
+            .first()
+        )
+        if state is None:
+            return None
+        updated_at, author_updated_at, relations = state
+        return max(updated_at, author_updated_at), relations
+
+    @conditional_response(
+        lambda view: view.get_list_state(), use_last_modified=False
+    )
+    @cache_anonymous_response(lambda view: ("recipes",))
+    def list(self, request, *args, **kwargs):
+        """Список рецептов через RecipeReader."""
+        recipe_ids = self.filter_queryset(self.get_queryset()).values_list(
+            "id", flat=True
+        )
+        page = self.paginate_queryset(recipe_ids)
+        if page is not None:
+            return self.get_paginated_response(
+                RecipeReader(request).read(page)
+            )
+        return Response(RecipeReader(request).read(recipe_ids))
+
+    @conditional_response(lambda view: view.get_object_state())
+    @cache_anonymous_response(lambda view: (f"recipe:{view.kwargs['pk']}",))
+    def retrieve(self, request, *args, **kwargs):
+        """Рецепт через RecipeReader."""
+        instance = self.get_object()
+        return Response(RecipeReader(request).read([instance.pk])[0])
+
     @action(
         detail=True,
         methods=["post"],
@@ -151,7 +251,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
 class RecipeShortLinkRedirectView(APIView):
 
     def get(self, request, short_code):
-        recipe = get_object_or_404(Recipe, short_code=short_code)
+        recipe_id = short_links_cache.get_or_set(
+            short_code,
+            lambda: get_object_or_404(
+                Recipe.objects.only("id"), short_code=short_code
+            ).pk,
+        )
         base_url = request.build_absolute_uri("/")
-        redirect_url = f"{base_url}recipes/{recipe.id}/"
+        redirect_url = f"{base_url}recipes/{recipe_id}/"
         return HttpResponseRedirect(redirect_url)
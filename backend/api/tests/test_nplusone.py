@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIClient
+
+from core.middleware import NPlusOneMiddleware
+from core.nplusone import NPlusOneError
+from recipes.models import Recipe
+from users.models import Subscription, User
+
+
+def author_names(queryset):
+    """Представление, читающее автора каждого рецепта."""
+
+    def view(request):
+        return JsonResponse(
+            {"authors": [recipe.author.username for recipe in queryset]}
+        )
+
+    return view
+
+
+class NPlusOneTests(TestCase):
+    """Тесты запускаются с поиском N+1 в режиме raise."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [
+            User.objects.create_user(
+                email=f"author{number}@example.com",
+                username=f"author{number}",
+                first_name="Автор",
+                last_name=str(number),
+                password="password",
+            )
+            for number in range(settings.NPLUSONE_THRESHOLD + 1)
+        ]
+        for author in cls.authors:
+            Recipe.objects.create(
+                author=author,
+                name=f"Рецепт {author.username}",
+                image="recipes/images/recipe.png",
+                text="Описание",
+                cooking_time=10,
+            )
+        cls.reader = cls.authors[0]
+        Subscription.objects.bulk_create(
+            Subscription(user=cls.reader, author=author)
+            for author in cls.authors[1:]
+        )
+
+    def test_test_runner_enables_raise_mode(self):
+        self.assertEqual(settings.NPLUSONE_DETECTION, "raise")
+
+    def test_lazy_foreign_key_loop_raises(self):
+        middleware = NPlusOneMiddleware(author_names(Recipe.objects.all()))
+        with self.assertRaisesMessage(NPlusOneError, "Recipe.author"):
+            middleware(RequestFactory().get("/"))
+
+    def test_select_related_passes(self):
+        middleware = NPlusOneMiddleware(
+            author_names(Recipe.objects.select_related("author"))
+        )
+        response = middleware(RequestFactory().get("/"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_api_lists(self):
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        for url in (
+            "/api/recipes/",
+            "/api/users/",
+            "/api/users/subscriptions/?recipes_limit=1",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(client.get(url).status_code, 200)
@@ -0,0 +1,40 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from core.management.commands.check_query_plans import MIN_ROWS
+from recipes.models import Ingredient
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Планы запросов проверяются только в PostgreSQL.",
+)
+class QueryPlanTests(TestCase):
+    """Ключевые запросы API не читают большие таблицы целиком."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f"ингредиент {number}", measurement_unit="г")
+            for number in range(2000)
+        )
+        # Таблица рецептов должна быть «большой» для проверки планов.
+        call_command(
+            "generate_data",
+            users=MIN_ROWS // 10,
+            recipes=MIN_ROWS,
+            stdout=StringIO(),
+        )
+
+    def test_key_queries(self):
+        output = StringIO()
+        try:
+            call_command(
+                "check_query_plans", stdout=output, stderr=output
+            )
+        except CommandError as error:
+            self.fail(f"{error}\n{output.getvalue()}")
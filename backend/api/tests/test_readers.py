@@ -0,0 +1,151 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.recipes.readers import RecipeReader
+from api.recipes.serializers import RecipeSerializer
+from core.cache import response_cache
+from core.pagination import PageNumberPagination
+from core.renderers import JSONRenderer
+from recipes.documents import refresh_recipe_documents
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Subscription, User
+
+
+class RecipeReaderTests(TestCase):
+    """RecipeReader отдает тот же JSON, что и RecipeSerializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Автор",
+            last_name="Рецептов",
+            password="password",
+            avatar="users/avatar.png",
+        )
+        cls.other_author = User.objects.create_user(
+            email="other@example.com",
+            username="other",
+            first_name="Другой",
+            last_name="Автор",
+            password="password",
+        )
+        cls.reader = User.objects.create_user(
+            email="reader@example.com",
+            username="reader",
+            first_name="Читатель",
+            last_name="Рецептов",
+            password="password",
+        )
+        breakfast = Tag.objects.create(name="Завтрак", slug="breakfast")
+        dinner = Tag.objects.create(name="Ужин", slug="dinner")
+        salt = Ingredient.objects.create(name="соль", measurement_unit="г")
+        milk = Ingredient.objects.create(name="молоко", measurement_unit="мл")
+        egg = Ingredient.objects.create(name="яйцо", measurement_unit="шт")
+
+        cls.recipes = [
+            Recipe.objects.create(
+                author=author,
+                name=f"Рецепт {number}",
+                image=f"recipes/images/{number}.png",
+                text="Описание",
+                cooking_time=number * 5,
+            )
+            for number, author in enumerate(
+                (cls.author, cls.author, cls.other_author), start=1
+            )
+        ]
+        first, second, third = cls.recipes
+        first.tags.set((breakfast, dinner))
+        second.tags.set((dinner,))
+        IngredientInRecipe.objects.bulk_create((
+            IngredientInRecipe(recipe=first, ingredient=egg, amount=2),
+            IngredientInRecipe(recipe=first, ingredient=milk, amount=200),
+            IngredientInRecipe(recipe=first, ingredient=salt, amount=5),
+            IngredientInRecipe(recipe=third, ingredient=milk, amount=100),
+        ))
+        Favorite.objects.create(user=cls.reader, recipe=first)
+        Favorite.objects.create(user=cls.author, recipe=third)
+        ShoppingCart.objects.create(user=cls.reader, recipe=third)
+        Subscription.objects.create(user=cls.reader, author=cls.author)
+        refresh_recipe_documents([recipe.pk for recipe in cls.recipes])
+
+    def request(self, user, query=None):
+        request = Request(APIRequestFactory().get("/api/recipes/", query))
+        request.user = user
+        return request
+
+    def recipes_queryset(self):
+        return Recipe.objects.select_related("author").prefetch_related(
+            "tags", "ingredient_amounts__ingredient"
+        )
+
+    def serialized(self, request, recipe_ids):
+        recipes = {recipe.pk: recipe for recipe in self.recipes_queryset()}
+        return RecipeSerializer(
+            [recipes[recipe_id] for recipe_id in recipe_ids],
+            many=True,
+            context={"request": request},
+        ).data
+
+    def assert_same_as_serializer(self, user):
+        """JSON читателя совпадает с JSON сериализатора побайтно."""
+        request = self.request(user)
+        recipe_ids = [recipe.pk for recipe in reversed(self.recipes)]
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(RecipeReader(request).read(recipe_ids)),
+            renderer.render(self.serialized(request, recipe_ids)),
+        )
+
+    def assert_list_same_as_serializer(self, user, query):
+        """Ответ списка рецептов совпадает с ответом на сериализаторе."""
+        request = self.request(user, query)
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(self.recipes_queryset(), request)
+        expected = paginator.get_paginated_response(
+            RecipeSerializer(
+                page, many=True, context={"request": request}
+            ).data
+        ).data
+
+        client = APIClient()
+        if user.is_authenticated:
+            client.force_authenticate(user)
+        response_cache.cache.clear()
+        response = client.get("/api/recipes/", query)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+    def test_anonymous(self):
+        self.assert_same_as_serializer(AnonymousUser())
+
+    def test_authenticated(self):
+        self.assert_same_as_serializer(self.reader)
+
+    def test_author(self):
+        self.assert_same_as_serializer(self.author)
+
+    def test_missing_document(self):
+        Recipe.objects.filter(pk=self.recipes[0].pk).update(document={})
+        self.assert_same_as_serializer(self.reader)
+
+    def test_list_anonymous(self):
+        for query in ({"limit": 2}, {"limit": 2, "page": 2}):
+            with self.subTest(query=query):
+                self.assert_list_same_as_serializer(AnonymousUser(), query)
+
+    def test_list_authenticated(self):
+        for query in ({"limit": 2}, {"limit": 2, "page": 2}):
+            with self.subTest(query=query):
+                self.assert_list_same_as_serializer(self.reader, query)
@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from core.fields import Base64ImageField
+from core.fields import Base64ImageField, MediaImageField
 from recipes.models import Recipe
 from users.models import Subscription
 
@@ -28,6 +28,9 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_is_subscribed(self, obj):
         """Проверка подписки текущего пользователя на автора."""
+        if hasattr(obj, "is_subscribed"):
+            # Аннотация списка: без запроса на каждого пользователя.
+            return obj.is_subscribed
         request = self.context.get("request")
         return (
             request
@@ -39,6 +42,8 @@ class UserSerializer(serializers.ModelSerializer):
 class RecipeMinifiedSerializer(serializers.ModelSerializer):
     """Упрощенный сериализатор рецепта для списков."""
 
+    image = MediaImageField(read_only=True)
+
     class Meta:
         model = Recipe
         fields = (
@@ -82,6 +87,9 @@ class UserWithRecipesSerializer(UserSerializer):
 
     def get_recipes_count(self, obj):
         """Количество рецептов автора."""
+        recipes_count = getattr(obj, "recipes_count", None)
+        if recipes_count is not None:
+            return recipes_count
         return obj.recipes.count()
 
 
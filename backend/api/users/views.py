@@ -1,4 +1,4 @@
-from django.db.models import Count
+from django.db.models import Count, Exists, OuterRef
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet as DjoserUserViewSet
 from rest_framework import status
@@ -6,7 +6,9 @@ from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from users.models import User
+from core.cache import cache_anonymous_response
+from core.conditional import conditional_response, relations_version
+from users.models import Subscription, User
 
 from .serializers import (
     AvatarSerializer,
@@ -16,6 +18,13 @@ from .serializers import (
 )
 
 
+def subscribed_to(user):
+    """Аннотация is_subscribed: подписан ли user на пользователя."""
+    return Exists(
+        Subscription.objects.filter(user=user, author=OuterRef("pk"))
+    )
+
+
 class UserViewSet(DjoserUserViewSet):
     """
     ViewSet для работы с пользователями.
@@ -35,6 +44,34 @@ class UserViewSet(DjoserUserViewSet):
     serializer_class = UserSerializer
     permission_classes = (AllowAny,)
 
+    def get_queryset(self):
+        """Список с признаком подписки текущего пользователя."""
+        queryset = super().get_queryset()
+        if self.action == "list" and self.request.user.is_authenticated:
+            queryset = queryset.annotate(
+                is_subscribed=subscribed_to(self.request.user)
+            )
+        return queryset
+
+    def get_object_state(self):
+        """Дата изменения профиля и версия подписок для ETag."""
+        if self.action == "me":
+            user_id = self.request.user.pk
+        else:
+            user_id = self.kwargs["id"]
+        return (
+            User.objects.filter(pk=user_id)
+            .annotate(relations=relations_version(self.request.user))
+            .values_list("updated_at", "relations")
+            .first()
+        )
+
+    @conditional_response(lambda view: view.get_object_state())
+    @cache_anonymous_response(lambda view: (f"user:{view.kwargs['id']}",))
+    def retrieve(self, request, *args, **kwargs):
+        """Профиль пользователя."""
+        return super().retrieve(request, *args, **kwargs)
+
     @action(
         detail=False,
         methods=["get"],
@@ -54,7 +91,10 @@ class UserViewSet(DjoserUserViewSet):
         """Получение списка подписок текущего пользователя."""
         queryset = (
             User.objects.filter(subscribers__user=request.user)
-            .annotate(recipes_count=Count("recipes"))
+            .annotate(
+                recipes_count=Count("recipes"),
+                is_subscribed=subscribed_to(request.user),
+            )
             .order_by("id")
             .prefetch_related("recipes")
         )
@@ -119,5 +159,7 @@ class UserViewSet(DjoserUserViewSet):
     @set_avatar.mapping.delete
     def delete_avatar(self, request):
         """Удаление аватара пользователя."""
-        request.user.avatar.delete(save=True)
+        # Файл удалит задача delete_images: он может быть общим.
+        request.user.avatar = None
+        request.user.save(update_fields=("avatar", "updated_at"))
         return Response(status=status.HTTP_204_NO_CONTENT)
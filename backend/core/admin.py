@@ -0,0 +1,352 @@
+import json
+
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth import get_permission_codename
+from django.core.paginator import Paginator
+from django.db import connection, router
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.html import format_html, format_html_join
+
+from core.deletion import cascades_in_database, db_cascade_relations
+from core.models import EndpointMemory, Job, RequestProfile
+
+# Ниже этого числа строк в выборке считается точный COUNT(*).
+EXACT_COUNT_LIMIT = 10000
+MEBIBYTE = 1 << 20
+
+
+def related_count(queryset, field, outer="pk"):
+    """
+    Число связанных строк коррелированным подзапросом.
+
+    В отличие от Count по JOIN, не требует GROUP BY по всей таблице:
+    подзапрос выполняется только для строк текущей страницы.
+    """
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef(outer)})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("*"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор с оценкой числа строк по плану запроса PostgreSQL.
+
+    Точный COUNT(*) выполняется, только если оценка меньше
+    EXACT_COUNT_LIMIT. В остальных базах счет всегда точный.
+    """
+
+    @cached_property
+    def count(self):
+        if connection.vendor == "postgresql" and hasattr(
+            self.object_list, "explain"
+        ):
+            plan = json.loads(self.object_list.explain(format="json"))
+            estimate = plan[0]["Plan"]["Plan Rows"]
+            if estimate >= EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Фильтр по внешнему ключу с выбором значения автодополнением.
+
+    В отличие от стандартного фильтра не загружает все связанные
+    объекты: поиск идет через autocomplete-представление админки,
+    поэтому у админки связанной модели должны быть search_fields.
+    """
+
+    template = "admin/core/autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f"{field_path}__{field.target_field.name}__exact"
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(
+            field, request, params, model, model_admin, field_path
+        )
+        self.title = getattr(
+            field, "verbose_name", field.related_model._meta.verbose_name
+        )
+        self.form_field = forms.ModelChoiceField(
+            queryset=field.related_model._default_manager.all(),
+            to_field_name=field.target_field.attname,
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.lookup_val is None,
+            "query_string": changelist.get_query_string(
+                remove=[self.lookup_kwarg]
+            ),
+            "display": "Все",
+        }
+
+    def rendered_widget(self):
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return self.form_field.widget.render(self.lookup_kwarg, value)
+
+
+class ScalableAdminMixin:
+    """
+    Настройки changelist для больших таблиц.
+
+    Оценка числа строк вместо COUNT(*), без повторного подсчета
+    без фильтров и без фасетов, плюс скрипты для AutocompleteFilter.
+    Страница подтверждения удаления показывает число строк, которые
+    удалит база по ON DELETE CASCADE, не загружая их.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+    @property
+    def media(self):
+        return (
+            super().media
+            + AutocompleteSelect(None, self.admin_site).media
+            + forms.Media(js=["core/admin/autocomplete_filter.js"])
+        )
+
+    def get_deleted_objects(self, objs, request):
+        deleted_objects, model_count, perms_needed, protected = (
+            super().get_deleted_objects(objs, request)
+        )
+        if not cascades_in_database(router.db_for_write(self.model)):
+            return deleted_objects, model_count, perms_needed, protected
+        for related in db_cascade_relations(self.model):
+            opts = related.related_model._meta
+            count = related.related_model._base_manager.filter(
+                **{f"{related.field.name}__in": objs}
+            ).count()
+            if not count:
+                continue
+            name = opts.verbose_name_plural
+            model_count[name] = model_count.get(name, 0) + count
+            codename = get_permission_codename("delete", opts)
+            if not request.user.has_perm(f"{opts.app_label}.{codename}"):
+                perms_needed.add(opts.verbose_name)
+        return deleted_objects, model_count, perms_needed, protected
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Админка для профилей запросов: просмотр и скачивание .prof."""
+
+    list_display = (
+        "created_at",
+        "method",
+        "path",
+        "status_code",
+        "duration_ms",
+        "query_count",
+        "query_time_ms",
+        "user",
+    )
+    list_filter = ("method", "status_code")
+    search_fields = ("path",)
+    list_select_related = ("user",)
+    fields = (
+        "created_at",
+        "user",
+        "method",
+        "path",
+        "status_code",
+        "duration_ms",
+        "query_count",
+        "query_time_ms",
+        "get_download_link",
+        "get_summary",
+        "get_queries",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "<path:object_id>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="core_requestprofile_download",
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, object_id):
+        """Статистика cProfile в формате pstats."""
+        profile = get_object_or_404(RequestProfile, pk=object_id)
+        if not self.has_view_permission(request, profile):
+            return HttpResponse(status=403)
+        response = HttpResponse(
+            bytes(profile.stats), content_type="application/octet-stream"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="profile-{profile.pk}.prof"'
+        )
+        return response
+
+    def get_download_link(self, obj):
+        """Ссылка на файл профиля."""
+        return format_html(
+            '<a href="{}">profile-{}.prof</a>',
+            reverse("admin:core_requestprofile_download", args=[obj.pk]),
+            obj.pk,
+        )
+
+    get_download_link.short_description = "Файл профиля"
+
+    def get_summary(self, obj):
+        """Сводка cProfile по накопленному времени."""
+        return format_html("<pre>{}</pre>", obj.summary)
+
+    get_summary.short_description = "Сводка"
+
+    def get_queries(self, obj):
+        """SQL-запросы с временем выполнения."""
+        return format_html(
+            "<ol>{}</ol>",
+            format_html_join(
+                "",
+                "<li>{} мс [{}]<pre>{}</pre></li>",
+                (
+                    (query["duration_ms"], query["alias"], query["sql"])
+                    for query in obj.queries
+                ),
+            ),
+        )
+
+    get_queries.short_description = "SQL-запросы"
+
+
+@admin.register(EndpointMemory)
+class EndpointMemoryAdmin(admin.ModelAdmin):
+    """Админка для памяти эндпоинтов: пики и места выделений."""
+
+    list_display = (
+        "view",
+        "action",
+        "samples",
+        "get_peak_mean",
+        "get_peak_max",
+        "updated_at",
+    )
+    search_fields = ("view",)
+    fields = (
+        "view",
+        "action",
+        "samples",
+        "get_peak_mean",
+        "get_peak_max",
+        "updated_at",
+        "get_sites",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_peak_mean(self, obj):
+        """Средний пик памяти, МиБ."""
+        return f"{obj.peak_mean / MEBIBYTE:.1f}"
+
+    get_peak_mean.short_description = "Средний пик, МиБ"
+
+    def get_peak_max(self, obj):
+        """Максимальный пик памяти, МиБ."""
+        return f"{obj.peak_max / MEBIBYTE:.1f}"
+
+    get_peak_max.short_description = "Максимальный пик, МиБ"
+    get_peak_max.admin_order_field = "peak_max"
+
+    def get_sites(self, obj):
+        """Места выделений со средним объемом на запрос."""
+        return format_html(
+            "<table>{}</table>",
+            format_html_join(
+                "",
+                "<tr><td>{} КиБ</td><td><code>{}</code></td></tr>",
+                (
+                    (f"{size / obj.samples / 1024:.1f}", site)
+                    for site, size in obj.sites.items()
+                ),
+            ),
+        )
+
+    get_sites.short_description = "Места выделений (в среднем на запрос)"
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Админка для очереди задач: ожидающие и отмененные задачи."""
+
+    list_display = (
+        "name",
+        "run_at",
+        "attempts",
+        "failed_at",
+        "created_at",
+    )
+    list_filter = ("name", ("failed_at", admin.EmptyFieldListFilter))
+    fields = (
+        "name",
+        "kwargs",
+        "run_at",
+        "attempts",
+        "failed_at",
+        "created_at",
+        "get_last_error",
+    )
+    readonly_fields = fields
+    actions = ("retry",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_last_error(self, obj):
+        """Трассировка последней ошибки."""
+        return format_html("<pre>{}</pre>", obj.last_error)
+
+    get_last_error.short_description = "Последняя ошибка"
+
+    def retry(self, request, queryset):
+        """Сброс попыток и постановка задач в очередь на сейчас."""
+        updated = queryset.update(
+            attempts=0, failed_at=None, run_at=timezone.now()
+        )
+        self.message_user(request, f"Задач поставлено в очередь: {updated}")
+
+    retry.short_description = "Выполнить выбранные задачи заново"
+    retry.allowed_permissions = ("delete",)
@@ -7,3 +7,11 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
     verbose_name = "Основные компоненты"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from core import db, instrumentation
+
+        instrumentation.install()
+        connection_created.connect(db.install_query_wrapper)
@@ -0,0 +1,40 @@
+import copy
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+
+from core.instrumentation import timed
+from core.localcache import tokens_cache
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+    """Аутентификация по токену с учетом времени в фазе auth."""
+
+    @timed("auth")
+    def authenticate(self, request):
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        """
+        Токен и пользователь из кэша процесса.
+
+        Запись удаляется во всех процессах при изменении пользователя
+        и сохранении или удалении токена (users.signals). Запрос
+        получает копии: представления меняют request.user.
+        """
+        model = self.get_model()
+        token = tokens_cache.get_or_set(
+            key,
+            lambda: model.objects.select_related("user")
+            .filter(key=key)
+            .first(),
+        )
+        if token is None:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        return token.user, token
@@ -0,0 +1,221 @@
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.instrumentation import record_cache
+
+RESPONSE_CACHE_PREFIX = "response"
+DEPENDENCY_PREFIX = "dependency"
+LOCK_PREFIX = "lock"
+LOCK_POLL_INTERVAL = 0.05
+
+
+class ResponseCache:
+    """
+    Кэш данных ответов с зависимостями и stale-while-revalidate.
+
+    Запись хранит версии своих зависимостей на момент расчета. Смена
+    версии любой зависимости (invalidate) делает запись устаревшей.
+    Устаревшую запись пересчитывает один запрос, взявший блокировку,
+    остальные в это время получают старые данные. При полном промахе
+    остальные запросы ждут результат того, кто взял блокировку.
+    Вместе с данными отдается версия записи: по ней строится ETag,
+    который всегда соответствует отданным, в том числе устаревшим,
+    данным.
+    """
+
+    def __init__(self, name, alias, timeout, stale_timeout, lock_timeout):
+        self.name = name
+        self.alias = alias
+        self.timeout = timeout
+        self.stale_timeout = stale_timeout
+        self.lock_timeout = lock_timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def enabled(self):
+        return self.timeout > 0
+
+    def get_or_set(self, key, dependencies, compute):
+        """
+        Пара (value, version): данные из кэша или результат compute()
+        и версия записи, из которой они взяты.
+
+        compute возвращает пару (value, cacheable); некэшируемые
+        значения отдаются как есть, с версией None.
+        """
+        entry_key = f"{RESPONSE_CACHE_PREFIX}:{key}"
+        lock_key = f"{LOCK_PREFIX}:{key}"
+        versions = self.versions(dependencies)
+        entry = self.cache.get(entry_key)
+        # Блокировку снимает только взявший ее: сверяется токен.
+        token = uuid.uuid4().hex
+
+        if entry is not None:
+            entry_versions, fresh_until, value = entry
+            if entry_versions == versions and fresh_until > time.time():
+                record_cache(self.name, "hit")
+                return value, entry_version(key, entry)
+            if not self.cache.add(lock_key, token, self.lock_timeout):
+                record_cache(self.name, "stale")
+                return value, entry_version(key, entry)
+        elif not self.cache.add(lock_key, token, self.lock_timeout):
+            entry = self._wait(entry_key, lock_key)
+            if entry is not None:
+                record_cache(self.name, "wait")
+                return entry[2], entry_version(key, entry)
+            token = None
+
+        record_cache(self.name, "miss")
+        try:
+            value, cacheable = compute()
+            entry = None
+            if cacheable:
+                entry = (versions, time.time() + self.timeout, value)
+                self.cache.set(
+                    entry_key, entry, self.timeout + self.stale_timeout
+                )
+        finally:
+            if token is not None and self.cache.get(lock_key) == token:
+                self.cache.delete(lock_key)
+        return value, None if entry is None else entry_version(key, entry)
+
+    def versions(self, dependencies):
+        """Текущие версии зависимостей; недостающие создаются."""
+        keys = [f"{DEPENDENCY_PREFIX}:{name}" for name in dependencies]
+        versions = self.cache.get_many(keys)
+        missing = [key for key in keys if key not in versions]
+        if missing:
+            for key in missing:
+                self.cache.add(key, uuid.uuid4().hex, None)
+            versions.update(self.cache.get_many(missing))
+        return tuple(versions.get(key) for key in keys)
+
+    def invalidate(self, *dependencies):
+        """Смена версий зависимостей."""
+        self.cache.set_many(
+            {
+                f"{DEPENDENCY_PREFIX}:{name}": uuid.uuid4().hex
+                for name in dependencies
+            },
+            None,
+        )
+
+    def _wait(self, entry_key, lock_key):
+        """
+        Ожидание записи, которую считает другой запрос.
+
+        Если блокировка снята, а записи нет (ответ не кэшируется или
+        расчет завершился ошибкой), ожидание прекращается: запрос
+        считает ответ сам, не дожидаясь lock_timeout.
+        """
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = self.cache.get(entry_key)
+            if entry is not None:
+                return entry
+            if self.cache.get(lock_key) is None:
+                return self.cache.get(entry_key)
+        return None
+
+
+response_cache = ResponseCache(
+    name="response",
+    alias=settings.RESPONSE_CACHE_ALIAS,
+    timeout=settings.RESPONSE_CACHE_TIMEOUT,
+    stale_timeout=settings.RESPONSE_CACHE_STALE_TIMEOUT,
+    lock_timeout=settings.RESPONSE_CACHE_LOCK_TIMEOUT,
+)
+
+
+def entry_version(key, entry):
+    """
+    Версия записи кэша: меняется при каждом пересчете.
+
+    Записи, пересчитанные с теми же версиями зависимостей, различает
+    срок свежести.
+    """
+    versions, fresh_until, _ = entry
+    return hashlib.md5(
+        repr((key, versions, fresh_until)).encode()
+    ).hexdigest()
+
+
+def invalidate(*dependencies):
+    """Инвалидация зависимостей после фиксации текущей транзакции."""
+    if dependencies:
+        transaction.on_commit(
+            lambda: response_cache.invalidate(*dependencies)
+        )
+
+
+def response_cache_key(view, request):
+    """Ключ ответа по действию, адресу и нормализованным параметрам."""
+    query = sorted(
+        (name, sorted(values))
+        for name, values in request.query_params.lists()
+    )
+    raw_key = repr((
+        view.basename,
+        view.action,
+        sorted(view.kwargs.items()),
+        request.scheme,
+        request.get_host(),
+        request.accepted_renderer.format,
+        query,
+    ))
+    return hashlib.md5(raw_key.encode()).hexdigest()
+
+
+def cache_anonymous_response(dependencies):
+    """
+    Декоратор действия ViewSet: кэш ответа для анонимных GET-запросов.
+
+    dependencies(view) возвращает имена зависимостей ответа,
+    например ("recipes",) или (f"recipe:{pk}",). Ответ из кэша
+    получает ETag по версии записи; conditional_response, видя
+    cached_for_anonymous, сверяет с ним If-None-Match без запроса
+    состояния к базе.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            if (
+                not response_cache.enabled
+                or request.method != "GET"
+                or request.user.is_authenticated
+            ):
+                return handler(view, request, *args, **kwargs)
+
+            def compute():
+                response = handler(view, request, *args, **kwargs)
+                cacheable = response.status_code == status.HTTP_200_OK
+                return (response.status_code, response.data), cacheable
+
+            (status_code, data), version = response_cache.get_or_set(
+                response_cache_key(view, request),
+                dependencies(view),
+                compute,
+            )
+            response = Response(data, status=status_code)
+            if version is not None:
+                response.headers["ETag"] = quote_etag(version)
+            return response
+
+        wrapper.cached_for_anonymous = True
+        return wrapper
+
+    return decorator
@@ -0,0 +1,125 @@
+import hashlib
+from functools import wraps
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db.models import DateTimeField, Subquery, Value
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from core.cache import response_cache
+
+SAFE_CONDITIONAL_METHODS = ("GET", "HEAD")
+
+
+def touch_relations(user_id):
+    """Смена версии избранного, покупок и подписок пользователя."""
+    get_user_model().objects.filter(pk=user_id).update(
+        relations_updated_at=timezone.now()
+    )
+
+
+def relations_version(user):
+    """
+    Выражение: версия избранного, покупок и подписок пользователя.
+
+    Добавляется в запрос состояния, чтобы версия читалась тем же
+    запросом. Читается из базы: объект пользователя может быть взят
+    из кэша токенов процесса и не видеть изменений из других
+    воркеров. Для анонима — NULL.
+    """
+    if not user.is_authenticated:
+        return Value(None, output_field=DateTimeField())
+    return Subquery(
+        get_user_model()
+        .objects.filter(pk=user.pk)
+        .values("relations_updated_at")[:1]
+    )
+
+
+def conditional_response(state, use_last_modified=True):
+    """
+    Декоратор действия ViewSet: ETag/Last-Modified и ответ 304.
+
+    state(view) одним легким запросом возвращает кортеж, первый
+    элемент которого — дата последнего изменения данных, либо None,
+    если объекта нет. Для авторизованных кортеж должен включать
+    relations_version(user): версию избранного, покупок и подписок.
+    ETag дополнительно учитывает адрес запроса, формат ответа и
+    пользователя. Если handler кэширует ответы анонимов
+    (cache_anonymous_response), анониму состояние не запрашивается:
+    ETag берется из записи кэша и соответствует отданным данным,
+    даже устаревшим. Last-Modified отдается только анонимам:
+    для остальных он не отражает смену флагов is_*. Спискам нужен
+    use_last_modified=False: удаление элемента не меняет дату
+    последнего изменения, и по If-Modified-Since клиент получил бы
+    304 со старым списком.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            if request.method not in SAFE_CONDITIONAL_METHODS:
+                return handler(view, request, *args, **kwargs)
+            user = request.user
+            if (
+                getattr(handler, "cached_for_anonymous", False)
+                and response_cache.enabled
+                and not user.is_authenticated
+            ):
+                return cached_conditional_response(
+                    handler(view, request, *args, **kwargs), request
+                )
+            try:
+                current_state = state(view)
+            except (TypeError, ValueError, ValidationError):
+                # Некорректный идентификатор: ответ 404 отдаст handler
+                current_state = None
+            if current_state is None:
+                return handler(view, request, *args, **kwargs)
+
+            last_modified = None
+            etag_parts = [
+                current_state,
+                request.get_host(),
+                request.get_full_path(),
+                request.accepted_renderer.format,
+            ]
+            if user.is_authenticated:
+                etag_parts.append(user.pk)
+            elif use_last_modified and current_state[0] is not None:
+                last_modified = int(current_state[0].timestamp())
+            etag = quote_etag(
+                hashlib.md5(repr(etag_parts).encode()).hexdigest()
+            )
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = handler(view, request, *args, **kwargs)
+            if response.status_code < 300 or response.status_code == 304:
+                response.headers.setdefault("ETag", etag)
+                if last_modified is not None:
+                    response.headers.setdefault(
+                        "Last-Modified", http_date(last_modified)
+                    )
+            patch_vary_headers(response, ("Authorization",))
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cached_conditional_response(response, request):
+    """Ответ 304 по ETag, выставленному кэшем ответов анонимов."""
+    etag = response.headers.get("ETag")
+    if etag is not None:
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified.headers["ETag"] = etag
+            response = not_modified
+    patch_vary_headers(response, ("Authorization",))
+    return response
@@ -0,0 +1,239 @@
+import datetime
+import decimal
+import io
+import json
+import logging
+import os
+import re
+import time
+import traceback
+import uuid
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection, connections
+
+from core.instrumentation import request_stats
+
+INSERT_BATCH_SIZE = 10000
+# Пакеты проекта, кадры которых попадают в стек медленного запроса.
+STACK_PACKAGES = ("api", "recipes", "users")
+STACK_LIMIT = 8
+# Параметры этих типов не содержат персональных данных и логируются.
+PLAIN_PARAM_TYPES = (decimal.Decimal, datetime.date, datetime.time, uuid.UUID)
+UNSAFE_COMMENT_CHARS = re.compile(r"[^\w.:-]")
+
+slow_query_logger = logging.getLogger("foodgram.db.slow_query")
+
+
+def copy_value(value) -> str:
+    """Значение в текстовом формате COPY PostgreSQL."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(cursor, table, columns, rows):
+    """Загрузка пачки строк в таблицу через COPY ... FROM STDIN."""
+    buffer = io.StringIO(
+        "".join(
+            "\t".join(map(copy_value, row)) + "\n" for row in rows
+        )
+    )
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer
+    )
+
+
+def insert_rows(table, columns, rows, batch_size=INSERT_BATCH_SIZE):
+    """
+    Потоковая вставка строк пачками.
+
+    В PostgreSQL используется COPY, в остальных базах — executemany.
+    В памяти одновременно держится не больше одной пачки. Возвращает
+    число вставленных строк.
+    """
+    rows = iter(rows)
+    inserted = 0
+    placeholders = ", ".join(["%s"] * len(columns))
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({placeholders})"
+    )
+    with connection.cursor() as cursor:
+        while batch := list(islice(rows, batch_size)):
+            if connection.vendor == "postgresql":
+                copy_rows(cursor, table, columns, batch)
+            else:
+                cursor.executemany(
+                    sql,
+                    [
+                        [
+                            json.dumps(value, ensure_ascii=False)
+                            if isinstance(value, (dict, list)) else value
+                            for value in row
+                        ]
+                        for row in batch
+                    ],
+                )
+            inserted += len(batch)
+    return inserted
+
+
+def reset_sequences(*models):
+    """Сдвиг последовательностей id после вставки с явными id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+@contextmanager
+def wrap_connections(wrapper):
+    """execute_wrapper для всех подключений текущего потока."""
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(wrapper))
+        yield
+
+
+@contextmanager
+def trace_queries():
+    """
+    Журнал SQL-запросов внутри блока.
+
+    Записи содержат alias подключения, текст запроса без параметров и
+    время выполнения в миллисекундах.
+    """
+    queries = []
+
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            queries.append({
+                "alias": context["connection"].alias,
+                "sql": sql,
+                "many": many,
+                "duration_ms": round(
+                    (time.perf_counter() - started) * 1000, 3
+                ),
+            })
+
+    with wrap_connections(wrapper):
+        yield queries
+
+
+def redact_param(value):
+    """Значение параметра для журнала: строки и байты скрываются."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, PLAIN_PARAM_TYPES):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [redact_param(item) for item in value]
+    return f"<{type(value).__name__}>"
+
+
+def redact_params(params, many):
+    """Параметры запроса без строковых значений."""
+    if params is None:
+        return None
+    if many:
+        return f"<{len(params)} наборов параметров>"
+    if isinstance(params, dict):
+        return {name: redact_param(value) for name, value in params.items()}
+    return [redact_param(value) for value in params]
+
+
+def sql_comment(labels):
+    """
+    Комментарий sqlcommenter с view и action.
+
+    Значения ограничены буквами, цифрами и «_.:-», поэтому в комментарий
+    не попадают кавычки, «*/» и «%», который драйвер принял бы за
+    подстановку параметра.
+    """
+    pairs = ",".join(
+        f"{name}='{UNSAFE_COMMENT_CHARS.sub('_', value)}'"
+        for name, value in sorted(labels.items())
+    )
+    return f"/*{pairs}*/"
+
+
+def app_stack():
+    """Кадры стека из кода проекта (STACK_PACKAGES), последние STACK_LIMIT."""
+    roots = tuple(
+        os.path.join(settings.BASE_DIR, package) + os.sep
+        for package in STACK_PACKAGES
+    )
+    return [
+        f"{os.path.relpath(frame.filename, settings.BASE_DIR)}:"
+        f"{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(roots)
+    ][-STACK_LIMIT:]
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """
+    execute_wrapper всех подключений: sqlcommenter и журнал медленных.
+
+    При SQL_COMMENTER к запросам внутри HTTP-запроса добавляется
+    комментарий с view и action. Запрос дольше SLOW_QUERY_MS пишется
+    в журнал foodgram.db.slow_query с параметрами без строк, view,
+    action и стеком вызовов из кода проекта.
+    """
+    stats = request_stats.get()
+    if stats is not None and settings.SQL_COMMENTER:
+        sql = f"{sql} {sql_comment(stats.labels())}"
+    if not settings.SLOW_QUERY_MS:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= settings.SLOW_QUERY_MS:
+            labels = stats.labels() if stats is not None else {}
+            view = labels.get("view", "-")
+            action = labels.get("action", "-")
+            slow_query_logger.warning(
+                "Медленный запрос %.1f мс (%s, %s.%s)\n%s\n"
+                "Параметры: %s\nСтек:\n  %s",
+                duration_ms,
+                context["connection"].alias,
+                view,
+                action,
+                sql,
+                redact_params(params, many),
+                "\n  ".join(app_stack()) or "-",
+                extra={
+                    "duration_ms": round(duration_ms, 1),
+                    "alias": context["connection"].alias,
+                    "view": view,
+                    "action": action,
+                },
+            )
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """Обработчик connection_created: подключение query_wrapper."""
+    if query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_wrapper)
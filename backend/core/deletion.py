@@ -0,0 +1,108 @@
+from django.db import connections
+from django.db.migrations.operations.base import Operation
+from django.db.models import CASCADE
+
+
+def cascades_in_database(using):
+    """Удаляет ли связанные строки сама база (ON DELETE CASCADE)."""
+    return connections[using].vendor == "postgresql"
+
+
+def DB_CASCADE(collector, field, sub_objs, using):
+    """
+    on_delete для внешних ключей с ON DELETE CASCADE в PostgreSQL.
+
+    Collector не загружает связанные строки и не удаляет их по
+    одной: это делает база в том же DELETE. Сигналы pre_delete и
+    post_delete для таких строк не отправляются, нужное обрабатывают
+    сигналы удаляемого объекта. На других базах работает как CASCADE.
+    """
+    if not cascades_in_database(using):
+        CASCADE(collector, field, sub_objs, using)
+
+
+# Collector не вычисляет queryset связанных строк перед вызовом.
+DB_CASCADE.lazy_sub_objs = True
+
+
+def db_cascade_relations(model):
+    """Обратные связи модели, которые удаляются на стороне базы."""
+    return [
+        related for related in model._meta.related_objects
+        if related.on_delete is DB_CASCADE
+    ]
+
+
+class DatabaseCascade(Operation):
+    """
+    Пересоздание внешнего ключа с ON DELETE CASCADE в PostgreSQL.
+
+    Для ManyToManyField меняется ключ промежуточной таблицы на эту
+    модель. Состояние моделей не меняется: on_delete задает
+    AlterField. Если поле позже изменит AlterField с пересозданием
+    ключа, операцию нужно повторить.
+    """
+
+    reversible = True
+
+    def __init__(self, model_name, name):
+        self.model_name = model_name
+        self.name = name
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        self.alter_foreign_key(
+            app_label, schema_editor, to_state, on_delete="CASCADE"
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        self.alter_foreign_key(
+            app_label, schema_editor, to_state, on_delete="NO ACTION"
+        )
+
+    def alter_foreign_key(self, app_label, schema_editor, state, on_delete):
+        connection = schema_editor.connection
+        if connection.vendor != "postgresql":
+            return
+        model = state.apps.get_model(app_label, self.model_name)
+        field = model._meta.get_field(self.name)
+        if field.many_to_many:
+            model = field.remote_field.through
+            field = model._meta.get_field(field.m2m_field_name())
+        if not self.allow_migrate_model(connection.alias, model):
+            return
+        table = model._meta.db_table
+        target = field.target_field
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, table
+            )
+        quote = schema_editor.quote_name
+        for name, constraint in constraints.items():
+            if not constraint["foreign_key"]:
+                continue
+            if constraint["columns"] != [field.column]:
+                continue
+            schema_editor.execute(
+                f"ALTER TABLE {quote(table)} "
+                f"DROP CONSTRAINT {quote(name)}, "
+                f"ADD CONSTRAINT {quote(name)} "
+                f"FOREIGN KEY ({quote(field.column)}) "
+                f"REFERENCES {quote(target.model._meta.db_table)} "
+                f"({quote(target.column)}) ON DELETE {on_delete} "
+                "DEFERRABLE INITIALLY DEFERRED"
+            )
+
+    def describe(self):
+        return (
+            f"ON DELETE CASCADE for foreign key "
+            f"{self.model_name}.{self.name}"
+        )
+
+    @property
+    def migration_name_fragment(self):
+        return f"{self.model_name.lower()}_{self.name.lower()}_db_cascade"
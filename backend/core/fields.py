@@ -1,15 +1,25 @@
 import base64
-import uuid
 
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 
+from core.media import media_url
+
 # Поддерживаемые форматы изображений
 SUPPORTED_IMAGE_FORMATS = {"jpeg", "jpg", "png", "gif", "webp"}
 DEFAULT_IMAGE_FORMAT = "jpg"
 
 
-class Base64ImageField(serializers.ImageField):
+class MediaImageField(serializers.ImageField):
+    """ImageField с адресом файла от MEDIA_BASE_URL (core.media)."""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return media_url(value.name, self.context.get("request"))
+
+
+class Base64ImageField(MediaImageField):
     """Кастомное поле для работы с Base64 изображениями."""
 
     def to_internal_value(self, data):
@@ -25,7 +35,8 @@ class Base64ImageField(serializers.ImageField):
                     ext = DEFAULT_IMAGE_FORMAT
 
                 decoded_file = base64.b64decode(imgstr)
-                data = ContentFile(decoded_file, name=f"{uuid.uuid4()}.{ext}")
+                # Итоговое имя по хешу содержимого задает хранилище
+                data = ContentFile(decoded_file, name=f"image.{ext}")
             except (ValueError, IndexError) as e:
                 raise serializers.ValidationError(
                     f"Неверный формат Base64 изображения: {str(e)}"
@@ -0,0 +1,189 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from rest_framework import serializers
+
+from core.metrics import registry
+
+request_stats = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    """
+    Показатели текущего запроса.
+
+    Время фаз (auth, serialize, render) считается без времени SQL,
+    выполненного внутри фазы: оно учитывается отдельно в db_time.
+    """
+
+    __slots__ = (
+        "request", "started", "duration", "phases", "active", "db_queries",
+        "db_time", "cache", "_labels",
+    )
+
+    def __init__(self, request):
+        self.request = request
+        self._labels = None
+        self.started = time.perf_counter()
+        self.duration = None
+        self.phases = {}
+        self.active = set()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache = []
+
+    def labels(self):
+        """Метки view и action; до разрешения URL — временные."""
+        if self._labels is not None:
+            return self._labels
+        labels = dict(zip(("view", "action"), view_labels(self.request)))
+        if getattr(self.request, "resolver_match", None) is not None:
+            self._labels = labels
+        return labels
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+    def server_timing(self):
+        """
+        Значение заголовка Server-Timing.
+
+        Фазы и SQL с длительностью в миллисекундах, обращения к кэшам
+        описанием, total — время от начала запроса до этого вызова.
+        """
+        metrics = [
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} SQL"'
+        ]
+        metrics.extend(
+            f"{name};dur={duration * 1000:.1f}"
+            for name, duration in self.phases.items()
+        )
+        metrics.extend(
+            f'cache;desc="{cache_name} {result}"'
+            for cache_name, result in self.cache
+        )
+        total = time.perf_counter() - self.started
+        metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """execute_wrapper: число и время SQL-запросов."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+@contextmanager
+def phase(name):
+    """
+    Учет времени блока как фазы текущего запроса.
+
+    Вложенный блок той же фазы (сериализатор внутри сериализатора)
+    не учитывается повторно. Вне запроса ничего не делает.
+    """
+    stats = request_stats.get()
+    if stats is None or name in stats.active:
+        yield
+        return
+    stats.active.add(name)
+    started = time.perf_counter()
+    db_time = stats.db_time
+    try:
+        yield
+    finally:
+        stats.active.discard(name)
+        elapsed = time.perf_counter() - started - (stats.db_time - db_time)
+        stats.phases[name] = stats.phases.get(name, 0) + elapsed
+
+
+def timed(name):
+    """Декоратор: вызов функции учитывается как фаза name."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_cache(cache_name, result):
+    """Обращение к кэшу: hit, miss, stale и т.п."""
+    registry.inc(
+        "foodgram_cache_requests_total",
+        {"cache": cache_name, "result": result},
+    )
+    stats = request_stats.get()
+    if stats is not None:
+        stats.cache.append((cache_name, result))
+
+
+def view_labels(request):
+    """
+    Метки view и action запроса.
+
+    Для ViewSet это имя класса и действие (list, retrieve, favorite),
+    для остальных представлений — имя маршрута и метод.
+    """
+    method = request.method.lower()
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched", method
+    view_class = getattr(match.func, "cls", None)
+    if view_class is None:
+        return match.view_name or match._func_path, method
+    actions = getattr(match.func, "actions", None) or {}
+    return view_class.__name__, actions.get(method, method)
+
+
+def record_request(request, response, stats):
+    """Метрики завершенного запроса."""
+    labels = stats.labels()
+    registry.inc(
+        "foodgram_http_requests_total",
+        dict(
+            labels, method=request.method, status=str(response.status_code)
+        ),
+    )
+    registry.observe(
+        "foodgram_http_request_duration_seconds", labels, stats.duration
+    )
+    registry.inc("foodgram_db_queries_total", labels, stats.db_queries)
+    registry.inc(
+        "foodgram_db_query_duration_seconds_total", labels, stats.db_time
+    )
+    registry.observe(
+        "foodgram_db_queries_per_request", labels, stats.db_queries
+    )
+    for name, duration in stats.phases.items():
+        registry.observe(
+            "foodgram_http_phase_duration_seconds",
+            dict(labels, phase=name),
+            duration,
+        )
+
+
+def install():
+    """
+    Учет времени сериализации DRF.
+
+    Представление сериализатора строится при обращении к .data, поэтому
+    свойство оборачивается фазой serialize у Serializer и ListSerializer.
+    """
+    for serializer_class in (
+        serializers.Serializer, serializers.ListSerializer
+    ):
+        data = serializer_class.data
+        if getattr(data.fget, "instrumented", False):
+            continue
+        getter = timed("serialize")(data.fget)
+        getter.instrumented = True
+        serializer_class.data = property(getter)
@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import time
+from functools import partial
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+CHANNEL = "foodgram_invalidation"
+# Предел размера сообщения NOTIFY, байт.
+PAYLOAD_LIMIT = 7900
+POLL_TIMEOUT = 5
+RECONNECT_DELAY = 1
+
+# Обработчики событий: тема — список функций handler(keys).
+handlers = {}
+
+logger = logging.getLogger("foodgram.invalidation")
+
+
+def sender_id():
+    """Процесс-отправитель; pid повторяются в разных контейнерах."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def subscribe(topic, handler):
+    """
+    Подписка на события темы.
+
+    handler(keys) получает список ключей или None, если устарело
+    все. Вызывается из потока, где зафиксирована транзакция, или из
+    потока Listener.
+    """
+    handlers.setdefault(topic, []).append(handler)
+
+
+def dispatch(topic, keys):
+    for handler in handlers.get(topic, ()):
+        handler(keys)
+
+
+def dispatch_all():
+    """Сброс всех подписчиков, когда события могли быть пропущены."""
+    for topic in handlers:
+        dispatch(topic, None)
+
+
+def publish(topic, keys=None, using=DEFAULT_DB_ALIAS):
+    """
+    Рассылка события после фиксации текущей транзакции.
+
+    В своем процессе обработчики вызываются в on_commit. Другим
+    процессам событие уходит через NOTIFY: PostgreSQL доставляет его
+    только при фиксации транзакции, а при откате отбрасывает. Слишком
+    длинный список ключей заменяется сбросом всей темы.
+    """
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        payload = json.dumps(
+            {"sender": sender_id(), "topic": topic, "keys": keys}
+        )
+        if len(payload.encode()) > PAYLOAD_LIMIT:
+            payload = json.dumps(
+                {"sender": sender_id(), "topic": topic, "keys": None}
+            )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+    transaction.on_commit(partial(dispatch, topic, keys), using=using)
+
+
+class Listener:
+    """
+    Прием событий других процессов через LISTEN.
+
+    Поток с отдельным подключением к базе запускается в каждом
+    воркере gunicorn после fork (open_connections), а в остальных
+    процессах — при первом обращении к локальному кэшу. После
+    разрыва соединения подписчики сбрасываются целиком: события за
+    это время потеряны. Без PostgreSQL ничего не делает: изменения
+    видны в других процессах через время жизни записей кэша.
+    """
+
+    def __init__(self, channel, using=DEFAULT_DB_ALIAS):
+        self.channel = channel
+        self.using = using
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            if connections[self.using].vendor != "postgresql":
+                return
+            threading.Thread(
+                target=self.run, name="invalidation-listener", daemon=True
+            ).start()
+
+    def skip_process(self):
+        """Не слушать события в текущем процессе (мастер gunicorn)."""
+        with self._lock:
+            self._pid = os.getpid()
+
+    def run(self):
+        connected = False
+        while True:
+            try:
+                self.listen(reconnected=connected)
+            except Exception:
+                logger.exception("Ошибка приема событий инвалидации")
+            finally:
+                connected = True
+                connections[self.using].close()
+            time.sleep(RECONNECT_DELAY)
+
+    def listen(self, reconnected):
+        connection = connections[self.using]
+        connection.ensure_connection()
+        raw = connection.connection
+        with raw.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        if reconnected:
+            dispatch_all()
+        sender = sender_id()
+        while True:
+            if select.select([raw], [], [], POLL_TIMEOUT) == ([], [], []):
+                continue
+            raw.poll()
+            while raw.notifies:
+                message = json.loads(raw.notifies.pop(0).payload)
+                if message["sender"] != sender:
+                    dispatch(message["topic"], message["keys"])
+
+
+listener = Listener(CHANNEL)
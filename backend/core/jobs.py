@@ -0,0 +1,142 @@
+import logging
+import time
+import traceback
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+from core.metrics import registry
+from core.models import Job
+
+# Зарегистрированные задачи: имя — функция.
+JOBS = {}
+
+logger = logging.getLogger("foodgram.jobs")
+
+
+def job(func):
+    """
+    Регистрация функции как фоновой задачи.
+
+    Задача ставится в очередь вызовом func.enqueue(**kwargs), аргументы
+    должны сериализоваться в JSON. Воркер находит задачи в модулях
+    jobs приложений.
+    """
+    name = f"{func.__module__}.{func.__name__}"
+    JOBS[name] = func
+    func.enqueue = partial(enqueue, name)
+    return func
+
+
+def enqueue(name, **kwargs):
+    """
+    Постановка задачи в очередь.
+
+    Строка задачи добавляется в текущей транзакции: воркер увидит ее
+    только после фиксации, а при откате задачи не будет. С JOBS_EAGER
+    задача выполняется в этом же процессе сразу после фиксации.
+    """
+    if settings.JOBS_EAGER:
+        transaction.on_commit(partial(JOBS[name], **kwargs))
+        return None
+    return Job.objects.create(name=name, kwargs=kwargs)
+
+
+def retry_delay(attempts):
+    """Задержка перед повтором: JOBS_RETRY_DELAY, удваиваемая с попыткой."""
+    return timedelta(seconds=settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def fail(job, error):
+    """Повтор задачи позже или отмена после JOBS_MAX_ATTEMPTS попыток."""
+    job.attempts += 1
+    job.last_error = error
+    if job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+        job.failed_at = timezone.now()
+        logger.error("Задача %s отменена после ошибок:\n%s", job, error)
+        result = "failed"
+    else:
+        job.run_at = timezone.now() + retry_delay(job.attempts)
+        logger.warning("Задача %s будет повторена:\n%s", job, error)
+        result = "retry"
+    job.save(update_fields=("attempts", "last_error", "failed_at", "run_at"))
+    return result
+
+
+def execute(job):
+    """
+    Выполнение задачи в точке сохранения.
+
+    При ошибке изменения задачи откатываются, а строка получает
+    новую попытку; выполненная задача удаляется.
+    """
+    labels = {"job": job.name}
+    registry.observe(
+        "foodgram_job_delay_seconds",
+        labels,
+        max((timezone.now() - job.run_at).total_seconds(), 0),
+    )
+    started = time.perf_counter()
+    try:
+        func = JOBS.get(job.name)
+        if func is None:
+            raise LookupError(f"Неизвестная задача {job.name}")
+        with transaction.atomic():
+            func(**job.kwargs)
+    except Exception:
+        result = fail(job, traceback.format_exc())
+    else:
+        job.delete()
+        result = "done"
+    registry.inc("foodgram_jobs_total", dict(labels, result=result))
+    registry.observe(
+        "foodgram_job_duration_seconds", labels, time.perf_counter() - started
+    )
+
+
+def run_next():
+    """
+    Выполнение одной готовой задачи; False, если таких нет.
+
+    Строка задачи блокируется SELECT ... FOR UPDATE SKIP LOCKED до
+    конца транзакции: воркеры не берут одну задачу дважды и не ждут
+    друг друга. Если воркер упадет, блокировка снимется вместе с
+    соединением, и задачу возьмет другой.
+    """
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(failed_at__isnull=True, run_at__lte=timezone.now())
+            .order_by("run_at", "id")
+            .first()
+        )
+        if job is None:
+            return False
+        execute(job)
+    return True
+
+
+def work(stop, poll_interval, burst=False):
+    """
+    Цикл воркера до события stop.
+
+    Задачи выполняются подряд, при пустой очереди воркер ждет
+    poll_interval секунд, а в режиме burst — завершается.
+    """
+    try:
+        while not stop.is_set():
+            try:
+                found = run_next()
+            except Exception:
+                logger.exception("Ошибка очереди задач")
+                found = False
+            close_old_connections()
+            if not found:
+                if burst:
+                    return
+                stop.wait(poll_interval)
+    finally:
+        connections.close_all()
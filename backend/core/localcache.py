@@ -0,0 +1,105 @@
+import threading
+import time
+
+from django.conf import settings
+
+from core import invalidation
+from core.instrumentation import record_cache
+
+
+class LocalCache:
+    """
+    Кэш в памяти процесса с временем жизни записей.
+
+    Для небольших, редко меняющихся данных, которые читаются почти в
+    каждом запросе: теги, поиск ингредиентов, короткие ссылки, токены.
+    Запрос к общему кэшу здесь стоил бы столько же, сколько запрос к
+    базе. Изменения рассылаются всем процессам через
+    core.invalidation (темой служит name), timeout ограничивает
+    устаревание, если событие потеряно.
+    """
+
+    def __init__(self, name, timeout, max_entries=1024):
+        self.name = name
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Растет при каждой инвалидации: значение, рассчитанное до
+        # нее, не сохраняется.
+        self._generation = 0
+        invalidation.subscribe(name, self.invalidate)
+
+    def get_or_set(self, key, compute):
+        """Значение из кэша или результат compute(); None не кэшируется."""
+        invalidation.listener.ensure_started()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            record_cache(self.name, "hit")
+            return entry[1]
+        record_cache(self.name, "miss")
+        generation = self._generation
+        value = compute()
+        if value is not None and generation == self._generation:
+            self.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, mapping):
+        expires = time.monotonic() + self.timeout
+        with self._lock:
+            for key, value in mapping.items():
+                if key not in self._entries:
+                    self._make_room()
+                self._entries[key] = (expires, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def invalidate(self, keys):
+        """Обработчик события: удаление ключей или, при None, очистка."""
+        if keys is None:
+            self.clear()
+            return
+        for key in keys:
+            self.delete(key)
+
+    def clear_on_commit(self):
+        """Очистка во всех процессах после фиксации транзакции."""
+        invalidation.publish(self.name)
+
+    def delete_on_commit(self, *keys):
+        """Удаление ключей во всех процессах после фиксации транзакции."""
+        invalidation.publish(self.name, list(keys))
+
+    def _make_room(self):
+        """Удаление устаревших, а если их нет — самой старой записи."""
+        if len(self._entries) < self.max_entries:
+            return
+        now = time.monotonic()
+        for key in [
+            key for key, (expires, _) in self._entries.items()
+            if expires <= now
+        ]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+
+tags_cache = LocalCache("tags", settings.LOCAL_CACHE_TIMEOUT)
+ingredients_cache = LocalCache("ingredients", settings.LOCAL_CACHE_TIMEOUT)
+short_links_cache = LocalCache(
+    "short_links", settings.LOCAL_CACHE_TIMEOUT, max_entries=100000
+)
+tokens_cache = LocalCache(
+    "tokens", settings.LOCAL_CACHE_TIMEOUT, max_entries=10000
+)
@@ -0,0 +1,351 @@
+import base64
+import io
+import json
+import random
+import statistics
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.db.models import Count
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.recipes.filters import RecipeFilter
+from api.recipes.readers import RecipeReader
+from api.recipes.serializers import RecipeSerializer
+from api.users.serializers import UserWithRecipesSerializer
+from core.fields import Base64ImageField
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag,
+)
+from recipes.utils import generate_shopping_list
+from users.models import Subscription, User
+
+REPEAT = 5
+THRESHOLD = 0.1
+AUTHORS = 5
+INGREDIENTS = 40
+INGREDIENTS_PER_RECIPE = 8
+IMAGE_SIZE = 768
+
+
+class Fixtures:
+    """
+    Данные для бенчмарков.
+
+    Создаются внутри транзакции, которую команда откатывает, поэтому
+    база после запуска не меняется.
+    """
+
+    def __init__(self, recipes):
+        rng = random.Random(0)
+        self.authors = [
+            User.objects.create(
+                username=f"benchmark_author_{number}",
+                email=f"benchmark_author_{number}@example.com",
+                first_name="Автор",
+                last_name=str(number),
+            )
+            for number in range(AUTHORS)
+        ]
+        self.reader = User.objects.create(
+            username="benchmark_reader",
+            email="benchmark_reader@example.com",
+            first_name="Читатель",
+            last_name="Бенчмарк",
+        )
+        self.tags = [
+            Tag.objects.create(name=f"benchmark {slug}", slug=slug)
+            for slug in ("benchmark-a", "benchmark-b", "benchmark-c")
+        ]
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f"Ингредиент {number}", measurement_unit="г")
+            for number in range(INGREDIENTS)
+        )
+        self.recipes = [
+            Recipe.objects.create(
+                author=self.authors[number % AUTHORS],
+                name=f"Рецепт {number}",
+                image="recipes/images/benchmark.png",
+                text="Описание рецепта. " * 20,
+                cooking_time=rng.randint(5, 120),
+            )
+            for number in range(recipes)
+        ]
+        amounts = []
+        for recipe in self.recipes:
+            recipe.tags.set(rng.sample(self.tags, 2))
+            amounts.extend(
+                IngredientInRecipe(
+                    recipe=recipe, ingredient=ingredient,
+                    amount=rng.randint(1, 500),
+                )
+                for ingredient in rng.sample(
+                    ingredients, INGREDIENTS_PER_RECIPE
+                )
+            )
+        IngredientInRecipe.objects.bulk_create(amounts)
+        Subscription.objects.bulk_create(
+            Subscription(user=self.reader, author=author)
+            for author in self.authors
+        )
+        Favorite.objects.bulk_create(
+            Favorite(user=self.reader, recipe=recipe)
+            for recipe in self.recipes[::2]
+        )
+        ShoppingCart.objects.bulk_create(
+            ShoppingCart(user=self.reader, recipe=recipe)
+            for recipe in self.recipes
+        )
+
+        request = APIRequestFactory().get(
+            "/api/recipes/", {"recipes_limit": 3}
+        )
+        self.request = Request(request)
+        self.request.user = self.reader
+
+        buffer = io.BytesIO()
+        Image.frombytes(
+            "RGB", (IMAGE_SIZE, IMAGE_SIZE),
+            rng.randbytes(IMAGE_SIZE * IMAGE_SIZE * 3),
+        ).save(buffer, "PNG")
+        self.image = (
+            "data:image/png;base64,"
+            + base64.b64encode(buffer.getvalue()).decode()
+        )
+
+
+def recipe_serializer(fixtures):
+    """RecipeSerializer по заранее загруженным рецептам."""
+    recipes = list(
+        Recipe.objects.filter(pk__in=[r.pk for r in fixtures.recipes])
+        .select_related("author")
+        .prefetch_related("tags", "ingredient_amounts__ingredient")
+    )
+    context = {"request": fixtures.request}
+    return lambda: RecipeSerializer(recipes, many=True, context=context).data
+
+
+def recipe_reader(fixtures):
+    """RecipeReader по тем же рецептам, для сравнения с сериализатором."""
+    recipe_ids = [recipe.pk for recipe in fixtures.recipes]
+    return lambda: RecipeReader(fixtures.request).read(recipe_ids)
+
+
+def user_with_recipes_serializer(fixtures):
+    """UserWithRecipesSerializer по подпискам, как в subscriptions."""
+    authors = list(
+        User.objects.filter(subscribers__user=fixtures.reader)
+        .annotate(recipes_count=Count("recipes"))
+        .order_by("id")
+        .prefetch_related("recipes")
+    )
+    context = {"request": fixtures.request}
+    return lambda: UserWithRecipesSerializer(
+        authors, many=True, context=context
+    ).data
+
+
+def recipe_filter(fixtures):
+    """Построение запроса RecipeFilter без его выполнения."""
+    data = QueryDict(mutable=True)
+    data.setlist("tags", [tag.slug for tag in fixtures.tags[:2]])
+    data.update({
+        "author": fixtures.authors[0].pk,
+        "is_favorited": "1",
+        "is_in_shopping_cart": "0",
+    })
+    return lambda: str(
+        RecipeFilter(
+            data=data, queryset=Recipe.objects.all(),
+            request=fixtures.request,
+        ).qs.query
+    )
+
+
+def shopping_list(fixtures):
+    """generate_shopping_list по корзине со всеми рецептами."""
+    return lambda: generate_shopping_list(fixtures.reader)
+
+
+def base64_image_field(fixtures):
+    """Base64ImageField.to_internal_value на большом изображении."""
+    field = Base64ImageField()
+    return lambda: field.to_internal_value(fixtures.image)
+
+
+def short_code(fixtures):
+    """Recipe.generate_short_code."""
+    recipe = fixtures.recipes[0]
+    return recipe.generate_short_code
+
+
+BENCHMARKS = {
+    "recipe_serializer": recipe_serializer,
+    "recipe_reader": recipe_reader,
+    "user_with_recipes_serializer": user_with_recipes_serializer,
+    "recipe_filter": recipe_filter,
+    "shopping_list": shopping_list,
+    "base64_image_field": base64_image_field,
+    "short_code": short_code,
+}
+
+
+def measure(func, repeat):
+    """
+    Время одного вызова, число запросов и выделения памяти.
+
+    Число вызовов в серии подбирается timeit.autorange; из серий
+    берутся минимум и медиана. Память считается tracemalloc на
+    отдельном вызове: пик и число блоков, выделенных за вызов.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [
+        total / number * 1e6 for total in timer.repeat(repeat, number)
+    ]
+
+    # При DEBUG журнал запросов ограничен и к этому моменту заполнен.
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        func()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(
+        stat.count_diff
+        for stat in after.compare_to(before, "lineno")
+        if stat.count_diff > 0
+    )
+    return {
+        "min_us": round(min(timings), 2),
+        "median_us": round(statistics.median(timings), 2),
+        "calls": number * repeat,
+        "queries": len(queries),
+        "peak_kib": round(peak / 1024, 1),
+        "blocks": blocks,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Микробенчмарки сериализаторов, фильтров и утилит: время вызова, "
+        "число запросов и выделения памяти. Данные создаются во "
+        "временной транзакции и откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names", nargs="*",
+            help="Бенчмарки для запуска: " + ", ".join(BENCHMARKS) + ".",
+        )
+        parser.add_argument(
+            "--recipes", type=int, default=50,
+            help="Количество рецептов в данных.",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=REPEAT,
+            help="Количество серий замеров.",
+        )
+        parser.add_argument(
+            "--save", type=Path,
+            help="Сохранить результаты как базовую линию в JSON.",
+        )
+        parser.add_argument(
+            "--compare", type=Path,
+            help="Сравнить с сохраненной базовой линией.",
+        )
+        parser.add_argument(
+            "--threshold", type=float, default=THRESHOLD,
+            help="Допустимое замедление min_us, доля (0.1 — 10%%).",
+        )
+
+    def handle(self, *args, **options):
+        names = options["names"] or list(BENCHMARKS)
+        unknown = set(names) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(
+                f"Неизвестные бенчмарки: {', '.join(sorted(unknown))}"
+            )
+        if options["recipes"] < 1 or options["repeat"] < 1:
+            raise CommandError("Некорректные параметры бенчмарка.")
+        baseline = None
+        if options["compare"]:
+            try:
+                baseline = json.loads(
+                    options["compare"].read_text(encoding="utf-8")
+                )
+            except (OSError, ValueError) as e:
+                raise CommandError(
+                    f"Не удалось прочитать {options['compare']}: {e}"
+                )
+
+        results = {}
+        with transaction.atomic():
+            fixtures = Fixtures(options["recipes"])
+            for name in names:
+                results[name] = measure(
+                    BENCHMARKS[name](fixtures), options["repeat"]
+                )
+                self._report(name, results[name])
+            transaction.set_rollback(True)
+
+        if options["save"]:
+            options["save"].write_text(
+                json.dumps(
+                    {"recipes": options["recipes"], "results": results},
+                    indent=2,
+                ) + "\n",
+                encoding="utf-8",
+            )
+            self.stdout.write(f"Результаты сохранены в {options['save']}")
+        if baseline is not None:
+            self._compare(results, baseline, options["threshold"])
+
+    def _report(self, name, result):
+        self.stdout.write(
+            f"{name:<30} {result['min_us']:>12.1f} мкс "
+            f"(медиана {result['median_us']:.1f}), "
+            f"запросов {result['queries']}, "
+            f"пик {result['peak_kib']} КиБ, блоков {result['blocks']}"
+        )
+
+    def _compare(self, results, baseline, threshold):
+        """Сравнение min_us с базовой линией; при регрессии — ошибка."""
+        regressions = []
+        for name, result in results.items():
+            previous = baseline["results"].get(name)
+            if previous is None:
+                continue
+            change = result["min_us"] / previous["min_us"] - 1
+            line = (
+                f"{name}: {previous['min_us']} -> {result['min_us']} мкс "
+                f"({change:+.1%})"
+            )
+            if change > threshold:
+                regressions.append(line)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(
+                f"Замедление больше {threshold:.0%}: {len(regressions)}"
+            )
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.views import SCHEMA_FORMATS, spectacular_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Собирает схему OpenAPI в YAML и JSON. Запускается при сборке "
+        "образа: /api/docs/ отдает готовые файлы, не строя схему "
+        "по сериализаторам на каждый запрос."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            type=Path,
+            default=settings.OPENAPI_SCHEMA_DIR,
+            help=(
+                "Каталог для файлов схемы "
+                f"(по умолчанию {settings.OPENAPI_SCHEMA_DIR})."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        # drf_spectacular нужен только здесь и не грузится в воркерах.
+        from drf_spectacular.renderers import (
+            OpenApiJsonRenderer,
+            OpenApiYamlRenderer,
+        )
+        from drf_spectacular.settings import spectacular_settings
+
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+        with spectacular_schema():
+            schema = generator.get_schema(request=None, public=True)
+        renderers = {
+            "yaml": OpenApiYamlRenderer(),
+            "json": OpenApiJsonRenderer(),
+        }
+        output_dir = options["output_dir"]
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for schema_format, (filename, _) in SCHEMA_FORMATS.items():
+            path = output_dir / filename
+            path.write_bytes(
+                renderers[schema_format].render(schema, renderer_context={})
+            )
+            self.stdout.write(str(path))
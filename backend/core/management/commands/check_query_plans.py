@@ -0,0 +1,168 @@
+import json
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.recipes.views import IngredientViewSet, RecipeViewSet
+from core.pagination import DEFAULT_PAGE_SIZE
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from recipes.utils import shopping_list_ingredients
+from users.models import User
+
+MIN_ROWS = 10000
+
+
+def view_queryset(viewset, user, query, action="list"):
+    """Отфильтрованный queryset действия ViewSet для данного запроса."""
+    request = Request(APIRequestFactory().get("/", query))
+    request.user = user or AnonymousUser()
+    view = viewset(
+        request=request, action=action, args=(), kwargs={},
+        format_kwarg=None,
+    )
+    return view.filter_queryset(view.get_queryset())
+
+
+def recipe_page(user=None, **query):
+    """Страница идентификаторов рецептов, как в RecipeViewSet.list."""
+    return view_queryset(RecipeViewSet, user, query).values_list(
+        "id", flat=True
+    )[:DEFAULT_PAGE_SIZE]
+
+
+def key_queries(sample):
+    """Ключевые запросы API с параметрами из базы."""
+    user, author = sample["user"], sample["author"]
+    recipe_ids = sample["recipe_ids"]
+    return {
+        "recipe feed": recipe_page(),
+        "recipe feed by tag": recipe_page(tags=sample["tag"]),
+        "author recipes": recipe_page(author=author.pk),
+        "favorited recipes": recipe_page(user, is_favorited=1),
+        "shopping cart recipes": recipe_page(user, is_in_shopping_cart=1),
+        "recipe documents": Recipe.objects.filter(
+            pk__in=recipe_ids
+        ).values_list("id", "document"),
+        "favorite flags": Favorite.objects.filter(
+            user=user, recipe_id__in=recipe_ids
+        ).values_list("recipe_id", flat=True),
+        "short link": Recipe.objects.filter(
+            short_code=sample["short_code"]
+        ).values_list("id", flat=True),
+        "ingredient search": view_queryset(
+            IngredientViewSet, None, {"name": sample["prefix"]}
+        ),
+        "shopping list": shopping_list_ingredients(user),
+        "subscriptions": User.objects.filter(subscribers__user=user)
+        .annotate(recipes_count=Count("recipes"))
+        .order_by("id")[:DEFAULT_PAGE_SIZE],
+    }
+
+
+def plan_problems(plan, table_rows, min_rows):
+    """Последовательные чтения и сортировки больших таблиц в плане."""
+    problems = []
+    node_type = plan["Node Type"]
+    relation = plan.get("Relation Name")
+    if node_type == "Seq Scan" and table_rows.get(relation, 0) >= min_rows:
+        problems.append(
+            f"Seq Scan on {relation} (~{table_rows[relation]:.0f} строк)"
+        )
+    if node_type == "Sort" and plan["Plan Rows"] >= min_rows:
+        problems.append(
+            f"Sort of ~{plan['Plan Rows']} rows by "
+            f"{', '.join(plan.get('Sort Key', []))}"
+        )
+    for child in plan.get("Plans", []):
+        problems.extend(plan_problems(child, table_rows, min_rows))
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        "Проверяет планы ключевых запросов API (EXPLAIN) на данных "
+        "generate_data и завершается с ошибкой, если запрос читает "
+        "большую таблицу последовательно или сортирует ее целиком. "
+        "Только для PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-rows", type=int, default=MIN_ROWS,
+            help="С какого числа строк таблица считается большой.",
+        )
+        parser.add_argument(
+            "--no-analyze", action="store_true",
+            help="Не обновлять статистику таблиц перед проверкой.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Проверка планов доступна только в PostgreSQL.")
+        min_rows = options["min_rows"]
+        if not options["no_analyze"]:
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        table_rows = self._table_rows()
+        if table_rows.get(Recipe._meta.db_table, 0) < min_rows:
+            self.stderr.write(
+                "Рецептов меньше --min-rows: на малых таблицах планировщик "
+                "выбирает последовательное чтение, проверка мало что "
+                "покажет. Заполните базу командой generate_data."
+            )
+
+        failed = 0
+        for name, queryset in key_queries(self._sample()).items():
+            plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+            problems = plan_problems(plan, table_rows, min_rows)
+            if options["verbosity"] > 1:
+                self.stdout.write(json.dumps(plan, indent=2))
+            if problems:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"FAIL {name}"))
+                for problem in problems:
+                    self.stdout.write(f"    {problem}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"OK   {name}"))
+        if failed:
+            raise CommandError(f"Проблемных запросов: {failed}")
+
+    @staticmethod
+    def _table_rows():
+        """Оценка числа строк таблиц по статистике PostgreSQL."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relname, reltuples FROM pg_class "
+                "WHERE relkind = 'r' AND relnamespace = "
+                "'public'::regnamespace"
+            )
+            return dict(cursor.fetchall())
+
+    @staticmethod
+    def _sample():
+        """Параметры запросов: активный пользователь, автор, тег и т.п."""
+        cart = ShoppingCart.objects.select_related("user").first()
+        recipe = Recipe.objects.select_related("author").first()
+        tag = Tag.objects.exclude(slug=None).first()
+        ingredient = Ingredient.objects.first()
+        if not (cart and recipe and tag and ingredient):
+            raise CommandError(
+                "Недостаточно данных. Выполните load_ingredients и "
+                "generate_data."
+            )
+        return {
+            "user": cart.user,
+            "author": recipe.author,
+            "tag": tag.slug,
+            "prefix": ingredient.name[:2],
+            "short_code": recipe.short_code,
+            "recipe_ids": list(
+                Recipe.objects.values_list("id", flat=True)[
+                    :DEFAULT_PAGE_SIZE
+                ]
+            ),
+        }
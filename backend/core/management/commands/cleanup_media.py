@@ -0,0 +1,103 @@
+import os
+import time
+from itertools import islice
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from core.storage import MIN_AGE
+
+
+def file_fields():
+    """Поля FileField всех моделей, хранящие файлы в default_storage."""
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+        and field.storage is default_storage
+    ]
+
+
+def walk(root, cutoff, prefix=""):
+    """
+    Имена файлов старше cutoff относительно MEDIA_ROOT.
+
+    os.scandir читает каталог по мере обхода, поэтому память не
+    растет с числом файлов.
+    """
+    with os.scandir(os.path.join(root, prefix)) as entries:
+        for entry in entries:
+            name = f"{prefix}{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk(root, cutoff, f"{name}/")
+            elif entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                yield name
+
+
+def referenced(fields, names):
+    """Имена из списка, на которые ссылается хотя бы одна запись."""
+    used = set()
+    for model, field in fields:
+        used.update(
+            model._base_manager.filter(
+                **{f"{field.name}__in": names}
+            ).values_list(field.attname, flat=True)
+        )
+    return used
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет из MEDIA_ROOT файлы, на которые не ссылается ни одно "
+        "поле FileField. Каталог и база читаются пачками, память "
+        "ограничена размером пачки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Файлов на один запрос к базе (по умолчанию 1000).",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=MIN_AGE,
+            help=(
+                "Не трогать файлы моложе, секунды: загрузка могла еще "
+                f"не зафиксироваться (по умолчанию {MIN_AGE})."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать файлы, которые были бы удалены.",
+        )
+
+    def handle(self, *args, **options):
+        root = default_storage.path("")
+        fields = file_fields()
+        files = (
+            walk(root, time.time() - options["min_age"])
+            if os.path.isdir(root) else iter(())
+        )
+        checked = removed = 0
+        while batch := list(islice(files, options["batch_size"])):
+            checked += len(batch)
+            used = referenced(fields, batch)
+            for name in batch:
+                if name in used:
+                    continue
+                if options["dry_run"]:
+                    self.stdout.write(name)
+                else:
+                    default_storage.delete(name)
+                removed += 1
+        action = "К удалению" if options["dry_run"] else "Удалено"
+        self.stdout.write(
+            f"Проверено файлов: {checked}. {action}: {removed}."
+        )
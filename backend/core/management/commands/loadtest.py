@@ -0,0 +1,481 @@
+import base64
+import http.client
+import importlib.util
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from recipes.management.commands.generate_data import PLACEHOLDER_PNG
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+# Сценарии и их доли в общем потоке запросов.
+SCENARIOS = {
+    "feed": 40,
+    "tag_filter": 15,
+    "recipe_detail": 20,
+    "ingredient_search": 10,
+    "favorite_toggle": 8,
+    "shopping_list": 5,
+    "recipe_create": 2,
+}
+AUTH_SCENARIOS = {"favorite_toggle", "shopping_list", "recipe_create"}
+FIXTURE_SIZE = 1000
+PAGE_SIZE = 6
+# Чем больше показатель, тем чаще открываются первые страницы ленты.
+PAGE_SKEW = 3
+PERCENTILES = (50, 95, 99)
+REQUEST_TIMEOUT = 30
+SERVER_START_TIMEOUT = 60
+IMAGE = "data:image/png;base64," + base64.b64encode(PLACEHOLDER_PNG).decode()
+
+
+def percentile(values, rank):
+    """Перцентиль отсортированного списка по методу ближайшего ранга."""
+    if not values:
+        return None
+    index = max(0, -(-len(values) * rank // 100) - 1)
+    return values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    """Сводка по одному эндпоинту: число запросов, rps и перцентили."""
+    latencies = sorted(latencies)
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": (
+            round(sum(latencies) / len(latencies), 2) if latencies else None
+        ),
+    }
+    for rank in PERCENTILES:
+        value = percentile(latencies, rank)
+        summary[f"p{rank}_ms"] = None if value is None else round(value, 2)
+    return summary
+
+
+class Worker(threading.Thread):
+    """
+    Поток нагрузки: выполняет сценарии до истечения времени.
+
+    У каждого потока свое keep-alive соединение, генератор случайных
+    чисел и пользователь; результаты собираются после завершения.
+    """
+
+    def __init__(self, address, fixtures, scenarios, until, seed, token):
+        super().__init__(daemon=True)
+        self.address = address
+        self.fixtures = fixtures
+        self.scenarios = list(scenarios)
+        self.weights = [SCENARIOS[name] for name in self.scenarios]
+        self.until = until
+        self.rng = random.Random(seed)
+        self.token = token
+        self.connection = None
+        self.recording = False
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def run(self):
+        while time.monotonic() < self.until["end"]:
+            self.recording = time.monotonic() >= self.until["warmup"]
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            getattr(self, scenario)()
+        if self.connection is not None:
+            self.connection.close()
+
+    def request(self, method, path, endpoint, body=None, auth=False):
+        """Запрос с замером времени; возвращает (статус, тело)."""
+        headers = {"Accept": "application/json"}
+        if auth:
+            headers["Authorization"] = f"Token {self.token}"
+        if body is not None:
+            body = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(
+                *self.address, timeout=REQUEST_TIMEOUT
+            )
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            if self.recording:
+                self.errors[endpoint] += 1
+            return None, b""
+        if self.recording:
+            self.latencies[endpoint].append(
+                (time.perf_counter() - started) * 1000
+            )
+            if response.status >= 400:
+                self.errors[endpoint] += 1
+        return response.status, data
+
+    def random_recipe(self):
+        return self.rng.choice(self.fixtures["recipe_ids"])
+
+    def feed(self):
+        pages = max(1, self.fixtures["recipe_count"] // PAGE_SIZE)
+        page = 1 + int(pages * self.rng.random() ** PAGE_SKEW)
+        self.request(
+            "GET", f"/api/recipes/?page={page}&limit={PAGE_SIZE}",
+            "GET /api/recipes/",
+        )
+
+    def tag_filter(self):
+        slugs = self.fixtures["tag_slugs"]
+        query = urlencode(
+            [("tags", slug) for slug in self.rng.sample(
+                slugs, self.rng.randint(1, min(2, len(slugs)))
+            )] + [("limit", PAGE_SIZE)]
+        )
+        self.request(
+            "GET", f"/api/recipes/?{query}", "GET /api/recipes/?tags="
+        )
+
+    def recipe_detail(self):
+        self.request(
+            "GET", f"/api/recipes/{self.random_recipe()}/",
+            "GET /api/recipes/{id}/",
+        )
+
+    def ingredient_search(self):
+        query = urlencode(
+            {"name": self.rng.choice(self.fixtures["ingredient_prefixes"])}
+        )
+        self.request(
+            "GET", f"/api/ingredients/?{query}", "GET /api/ingredients/"
+        )
+
+    def favorite_toggle(self):
+        path = f"/api/recipes/{self.random_recipe()}/favorite/"
+        endpoint = "/api/recipes/{id}/favorite/"
+        status, _ = self.request("POST", path, f"POST {endpoint}", auth=True)
+        self.request("DELETE", path, f"DELETE {endpoint}", auth=True)
+        if status == 400:
+            # Рецепт уже был в избранном: возвращаем как было.
+            self.request("POST", path, f"POST {endpoint}", auth=True)
+
+    def shopping_list(self):
+        self.request(
+            "GET", "/api/recipes/download_shopping_cart/",
+            "GET /api/recipes/download_shopping_cart/", auth=True,
+        )
+
+    def recipe_create(self):
+        ingredient_ids = self.rng.sample(
+            self.fixtures["ingredient_ids"],
+            min(5, len(self.fixtures["ingredient_ids"])),
+        )
+        status, data = self.request(
+            "POST", "/api/recipes/", "POST /api/recipes/",
+            body={
+                "ingredients": [
+                    {"id": pk, "amount": self.rng.randint(1, 500)}
+                    for pk in ingredient_ids
+                ],
+                "tags": [self.rng.choice(self.fixtures["tag_ids"])],
+                "image": IMAGE,
+                "name": "Нагрузочный тест",
+                "text": "Рецепт создан командой loadtest.",
+                "cooking_time": self.rng.randint(1, 120),
+            },
+            auth=True,
+        )
+        if status == 201:
+            # Удаляем рецепт, чтобы повторные прогоны шли на тех же данных.
+            self.request(
+                "DELETE", f"/api/recipes/{json.loads(data)['id']}/",
+                "DELETE /api/recipes/{id}/", auth=True,
+            )
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный тест API: запускает приложение (или использует "
+        "--url), выполняет сценарии в несколько потоков и выводит "
+        "p50/p95/p99 и rps по эндпоинтам в JSON. Данные готовятся "
+        "командами load_ingredients и generate_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            help="Адрес запущенного приложения; без него сервер "
+                 "запускается командой.",
+        )
+        parser.add_argument(
+            "--bind", default="127.0.0.1:8765",
+            help="Адрес запускаемого сервера.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4,
+            help="Число процессов gunicorn запускаемого сервера.",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8,
+            help="Число параллельных клиентов.",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=30,
+            help="Длительность замера в секундах.",
+        )
+        parser.add_argument(
+            "--warmup", type=float, default=5,
+            help="Прогрев перед замером в секундах.",
+        )
+        parser.add_argument(
+            "--scenarios", default=",".join(SCENARIOS),
+            help="Сценарии через запятую: " + ", ".join(SCENARIOS) + ".",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Зерно генератора случайных чисел.",
+        )
+        parser.add_argument(
+            "--output", type=Path,
+            help="Файл для результатов в JSON; по умолчанию stdout.",
+        )
+        parser.add_argument(
+            "--compare", type=Path,
+            help="Файл результатов прошлого прогона для сравнения.",
+        )
+
+    def handle(self, *args, **options):
+        scenarios = [
+            name.strip() for name in options["scenarios"].split(",")
+            if name.strip()
+        ]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if not scenarios or unknown:
+            raise CommandError(
+                f"Неизвестные сценарии: {', '.join(sorted(unknown))}"
+            )
+        if options["concurrency"] < 1 or options["duration"] <= 0:
+            raise CommandError("Некорректные параметры нагрузки.")
+        baseline = self._load(options["compare"])
+        fixtures = self._fixtures(
+            options["concurrency"], AUTH_SCENARIOS & set(scenarios)
+        )
+
+        server = None
+        url = options["url"]
+        if url is None:
+            url = f"http://{options['bind']}"
+            server = self._start_server(options["bind"], options["workers"])
+        try:
+            self._wait_ready(url, server)
+            result = self._run(urlsplit(url), fixtures, scenarios, options)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        output = json.dumps(result, ensure_ascii=False, indent=2)
+        if options["output"]:
+            options["output"].write_text(output + "\n", encoding="utf-8")
+            self.stderr.write(f"Результаты сохранены в {options['output']}")
+        else:
+            self.stdout.write(output)
+        if baseline is not None:
+            self._compare(result, baseline)
+
+    @staticmethod
+    def _load(path):
+        if path is None:
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Не удалось прочитать {path}: {e}")
+
+    @staticmethod
+    def _fixtures(concurrency, auth_scenarios):
+        """Идентификаторы и токены для сценариев, выбранные из базы."""
+        recipe_ids = list(
+            Recipe.objects.values_list("id", flat=True)[:FIXTURE_SIZE]
+        )
+        tags = list(Tag.objects.values_list("id", "slug"))
+        ingredients = list(
+            Ingredient.objects.order_by("?").values_list("id", "name")[
+                :FIXTURE_SIZE
+            ]
+        )
+        if not recipe_ids or not tags or not ingredients:
+            raise CommandError(
+                "Недостаточно данных. Выполните load_ingredients и "
+                "generate_data."
+            )
+        tokens = []
+        if auth_scenarios:
+            users = User.objects.filter(
+                is_active=True, is_staff=False
+            ).order_by("id")[:concurrency]
+            tokens = [
+                Token.objects.get_or_create(user=user)[0].key
+                for user in users
+            ]
+            if not tokens:
+                raise CommandError(
+                    "Нет пользователей для сценариев "
+                    f"{', '.join(sorted(auth_scenarios))}."
+                )
+        return {
+            "recipe_ids": recipe_ids,
+            "recipe_count": Recipe.objects.count(),
+            "tag_ids": [pk for pk, _ in tags],
+            "tag_slugs": [slug for _, slug in tags if slug],
+            "ingredient_ids": [pk for pk, _ in ingredients],
+            "ingredient_prefixes": sorted({
+                name[:length].lower()
+                for _, name in ingredients
+                for length in (1, 2, 3)
+            }),
+            "tokens": tokens,
+        }
+
+    def _start_server(self, bind, workers):
+        """Запуск gunicorn, а без него — сервера разработки."""
+        if importlib.util.find_spec("gunicorn") is not None:
+            command = [
+                sys.executable, "-m", "gunicorn", "foodgram.wsgi",
+                "--bind", bind, "--workers", str(workers),
+            ]
+        else:
+            command = [
+                sys.executable, "manage.py", "runserver", bind,
+                "--noreload",
+            ]
+        self.stderr.write(f"Запуск сервера: {' '.join(command)}")
+        return subprocess.Popen(
+            command,
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    @staticmethod
+    def _wait_ready(url, server):
+        parts = urlsplit(url)
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if server is not None and server.poll() is not None:
+                raise CommandError("Сервер завершился при запуске.")
+            connection = http.client.HTTPConnection(
+                parts.hostname, parts.port or 80, timeout=REQUEST_TIMEOUT
+            )
+            try:
+                connection.request("GET", "/api/tags/")
+                if connection.getresponse().status == 200:
+                    return
+            except (OSError, http.client.HTTPException):
+                pass
+            finally:
+                connection.close()
+            time.sleep(0.5)
+        raise CommandError(f"Сервер {url} не отвечает.")
+
+    def _run(self, url, fixtures, scenarios, options):
+        started = time.monotonic()
+        until = {
+            "warmup": started + options["warmup"],
+            "end": started + options["warmup"] + options["duration"],
+        }
+        tokens = fixtures["tokens"]
+        workers = [
+            Worker(
+                (url.hostname, url.port or 80), fixtures, scenarios, until,
+                f"{options['seed']}:{number}",
+                tokens[number % len(tokens)] if tokens else None,
+            )
+            for number in range(options["concurrency"])
+        ]
+        self.stderr.write(
+            f"Нагрузка: {len(workers)} клиентов, прогрев "
+            f"{options['warmup']} с, замер {options['duration']} с"
+        )
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = options["duration"]
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        for worker in workers:
+            for endpoint, values in worker.latencies.items():
+                latencies[endpoint].extend(values)
+            for endpoint, count in worker.errors.items():
+                errors[endpoint] += count
+        endpoints = {
+            endpoint: summarize(latencies[endpoint], errors[endpoint], elapsed)
+            for endpoint in sorted(set(latencies) | set(errors))
+        }
+        return {
+            "meta": {
+                "commit": self._commit(),
+                "url": url.geturl(),
+                "concurrency": options["concurrency"],
+                "duration": options["duration"],
+                "warmup": options["warmup"],
+                "seed": options["seed"],
+                "scenarios": scenarios,
+            },
+            "total": summarize(
+                [value for values in latencies.values() for value in values],
+                sum(errors.values()),
+                elapsed,
+            ),
+            "endpoints": endpoints,
+        }
+
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _compare(self, result, baseline):
+        """Изменение p95 и rps относительно прошлого прогона."""
+        self.stderr.write(
+            f"Сравнение с {baseline['meta'].get('commit') or 'baseline'}:"
+        )
+        rows = [("total", result["total"], baseline["total"])] + [
+            (endpoint, summary, baseline["endpoints"][endpoint])
+            for endpoint, summary in result["endpoints"].items()
+            if endpoint in baseline["endpoints"]
+        ]
+        for endpoint, current, previous in rows:
+            self.stderr.write(
+                f"  {endpoint}: p95 {self._delta(current, previous, 'p95_ms')}"
+                f", rps {self._delta(current, previous, 'rps')}"
+            )
+
+    @staticmethod
+    def _delta(current, previous, key):
+        new, old = current.get(key), previous.get(key)
+        if new is None or not old:
+            return f"{old} -> {new}"
+        return f"{old} -> {new} ({(new - old) / old:+.1%})"
@@ -0,0 +1,89 @@
+import multiprocessing
+import signal
+import threading
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.module_loading import autodiscover_modules
+
+from core.jobs import work
+
+
+def process_worker(stop, poll_interval, burst):
+    """Воркер в отдельном процессе, в том числе запущенном через spawn."""
+    # Ctrl+C получает вся группа процессов: остановку ведет родитель.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+    autodiscover_modules("jobs")
+    work(stop, poll_interval, burst)
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет фоновые задачи из очереди core.jobs в пуле потоков "
+        "или процессов. SIGTERM и SIGINT завершают воркеры после "
+        "текущих задач."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Число воркеров (по умолчанию 4).",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=("thread", "process"),
+            default="thread",
+            help=(
+                "Потоки для задач, ждущих базу и файлы, процессы — для "
+                "задач, нагружающих процессор (по умолчанию thread)."
+            ),
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Пауза при пустой очереди, секунды (по умолчанию 1).",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Выполнить готовые задачи и завершиться.",
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules("jobs")
+        worker_args = (options["poll_interval"], options["burst"])
+        if options["pool"] == "process":
+            stop = multiprocessing.Event()
+            # Дочерние процессы открывают свои соединения.
+            connections.close_all()
+            workers = [
+                multiprocessing.Process(
+                    target=process_worker, args=(stop, *worker_args)
+                )
+                for _ in range(options["workers"])
+            ]
+        else:
+            stop = threading.Event()
+            workers = [
+                threading.Thread(target=work, args=(stop, *worker_args))
+                for _ in range(options["workers"])
+            ]
+
+        def shutdown(signum, frame):
+            self.stdout.write("Завершение после текущих задач...")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+        for worker in workers:
+            worker.start()
+        self.stdout.write(
+            f"Запущено воркеров: {len(workers)} ({options['pool']})"
+        )
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.utils.encoding import filepath_to_uri
+
+
+def media_base_url(request):
+    """
+    Адрес каталога медиа с завершающим /.
+
+    MEDIA_BASE_URL (например, адрес CDN) используется как есть. Без
+    него адрес строится по хосту запроса один раз и запоминается в
+    request: get_host() с проверкой ALLOWED_HOSTS не вызывается для
+    каждого объекта в списке.
+    """
+    if settings.MEDIA_BASE_URL:
+        return settings.MEDIA_BASE_URL.rstrip("/") + "/"
+    if request is None:
+        return settings.MEDIA_URL
+    base_url = getattr(request, "_media_base_url", None)
+    if base_url is None:
+        base_url = request.build_absolute_uri(settings.MEDIA_URL)
+        request._media_base_url = base_url
+    return base_url
+
+
+def media_url(name, request):
+    """
+    Абсолютный URL файла из default_storage; None для пустого имени.
+
+    Имена файлов — хеши содержимого (core.storage), поэтому адрес
+    меняется вместе с файлом и кэшируется без ограничения срока.
+    """
+    if not name:
+        return None
+    return media_base_url(request) + filepath_to_uri(name)
@@ -0,0 +1,92 @@
+import os
+import threading
+import tracemalloc
+
+from django.conf import settings
+from django.db import transaction
+
+from core.metrics import registry
+from core.models import EndpointMemory
+
+# Сколько мест выделений хранить для представления.
+SITES_KEPT = 50
+# Выделения самого tracemalloc и импорта модулей не учитываются.
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# tracemalloc общий для процесса: в выборке одновременно один запрос.
+sampling_lock = threading.Lock()
+
+
+def site_name(frame):
+    """Место выделения: путь относительно проекта или site-packages."""
+    filename = frame.filename
+    marker = f"site-packages{os.sep}"
+    if marker in filename:
+        filename = filename.split(marker, 1)[1]
+    elif filename.startswith(str(settings.BASE_DIR)):
+        filename = os.path.relpath(filename, settings.BASE_DIR)
+    return f"{filename}:{frame.lineno}"
+
+
+def top_sites(snapshot, limit):
+    """Места с наибольшим объемом памяти в снимке, байт."""
+    statistics = snapshot.filter_traces(SNAPSHOT_FILTERS).statistics(
+        "lineno"
+    )
+    return {
+        site_name(statistic.traceback[0]): statistic.size
+        for statistic in statistics[:limit]
+    }
+
+
+class MemorySample:
+    """
+    Запрос под tracemalloc.
+
+    Трассировка начинается вместе с запросом, поэтому peak — пик
+    памяти Python с начала запроса, а sites — места выделений, память
+    которых занята к концу обработки. Учитываются выделения всех
+    потоков процесса за это время.
+    """
+
+    def __init__(self):
+        self.peak = 0
+        self.sites = {}
+
+    def __enter__(self):
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            _, self.peak = tracemalloc.get_traced_memory()
+            self.sites = top_sites(
+                tracemalloc.take_snapshot(), settings.MEMORY_PROFILE_TOP
+            )
+        finally:
+            tracemalloc.stop()
+        return False
+
+
+def record_sample(labels, sample):
+    """Пик в метриках и накопление мест выделений в EndpointMemory."""
+    registry.observe("foodgram_memory_peak_bytes", labels, sample.peak)
+    with transaction.atomic():
+        endpoint, _ = EndpointMemory.objects.select_for_update().get_or_create(
+            view=labels["view"], action=labels["action"]
+        )
+        endpoint.samples += 1
+        endpoint.peak_total += sample.peak
+        endpoint.peak_max = max(endpoint.peak_max, sample.peak)
+        sites = endpoint.sites
+        for site, size in sample.sites.items():
+            sites[site] = sites.get(site, 0) + size
+        endpoint.sites = dict(
+            sorted(sites.items(), key=lambda item: -item[1])[:SITES_KEPT]
+        )
+        endpoint.save()
@@ -0,0 +1,279 @@
+import atexit
+import json
+import math
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+MEMORY_BUCKETS = tuple(size << 20 for size in (1, 4, 16, 64, 256, 1024))
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+# Имя метрики: тип, описание и границы корзин для гистограмм.
+METRICS = {
+    "foodgram_http_requests_total": (
+        "counter", "Число запросов по представлению, действию и статусу.",
+        None,
+    ),
+    "foodgram_http_request_duration_seconds": (
+        "histogram", "Время обработки запроса.", LATENCY_BUCKETS,
+    ),
+    "foodgram_http_phase_duration_seconds": (
+        "histogram",
+        "Время фаз запроса (auth, serialize, render) без учета SQL.",
+        LATENCY_BUCKETS,
+    ),
+    "foodgram_db_queries_total": (
+        "counter", "Число SQL-запросов.", None,
+    ),
+    "foodgram_db_query_duration_seconds_total": (
+        "counter", "Суммарное время SQL-запросов.", None,
+    ),
+    "foodgram_db_queries_per_request": (
+        "histogram", "Число SQL-запросов на HTTP-запрос.", QUERY_BUCKETS,
+    ),
+    "foodgram_memory_peak_bytes": (
+        "histogram",
+        "Пик памяти Python за запрос по выборке MEMORY_PROFILE_SAMPLE_RATE.",
+        MEMORY_BUCKETS,
+    ),
+    "foodgram_cache_requests_total": (
+        "counter", "Обращения к кэшам по результату (hit, miss и т.п.).",
+        None,
+    ),
+    "foodgram_jobs_total": (
+        "counter",
+        "Выполнения фоновых задач по результату (done, retry, failed).",
+        None,
+    ),
+    "foodgram_job_duration_seconds": (
+        "histogram", "Время выполнения фоновой задачи.", JOB_BUCKETS,
+    ),
+    "foodgram_job_delay_seconds": (
+        "histogram",
+        "Ожидание фоновой задачи в очереди после срока run_at.",
+        JOB_BUCKETS,
+    ),
+}
+
+
+def format_value(value):
+    """Число в текстовом формате Prometheus."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels):
+    """Метки в виде {name="value",...} с экранированием значений."""
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for name, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+class MetricsRegistry:
+    """
+    Счетчики и гистограммы процесса с объединением по каталогу.
+
+    Каждый процесс хранит значения в памяти и раз в flush_interval
+    секунд записывает их в файл <host>-<pid>.json каталога directory. При
+    сборе файлы всех процессов складываются, поэтому метрики воркеров
+    gunicorn агрегируются без внешнего агента. Файлы завершившихся
+    процессов остаются: их счетчики входят в сумму до очистки каталога
+    при перезапуске. Без каталога отдаются метрики текущего процесса.
+    """
+
+    def __init__(self, directory, flush_interval):
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pid = None
+        self._skipped = False
+        self._values = {}
+        self._dirty = False
+        # Поток записи мог держать блокировку в момент fork: в дочернем
+        # процессе она осталась бы захваченной навсегда.
+        os.register_at_fork(after_in_child=self._reset_lock)
+
+    def skip_process(self):
+        """Не учитывать значения в текущем процессе (мастер gunicorn)."""
+        with self._lock:
+            self._pid = os.getpid()
+            self._skipped = True
+            self._values = {}
+            self._dirty = False
+
+    def inc(self, name, labels, value=1):
+        """Увеличение счетчика."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if not self._check_process():
+                return
+            self._values[key] = self._values.get(key, 0) + value
+            self._dirty = True
+
+    def observe(self, name, labels, value):
+        """Наблюдение гистограммы: корзины, сумма и количество."""
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if not self._check_process():
+                return
+            # Корзины накопительные, последние два элемента — sum и count.
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(buckets) + 2)
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+            self._dirty = True
+
+    def flush(self):
+        """Запись значений процесса в его файл каталога."""
+        if self.directory is None:
+            return
+        with self._lock:
+            if not self._dirty or self._pid != os.getpid():
+                return
+            data = [
+                [name, list(map(list, labels)), value]
+                for (name, labels), value in self._values.items()
+            ]
+            self._dirty = False
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Каталог может быть общим для контейнеров с одинаковыми pid.
+        path = self.directory / f"{socket.gethostname()}-{self._pid}.json"
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(temporary, path)
+
+    def clear(self):
+        """Удаление файлов процессов; вызывается при запуске сервиса."""
+        if self.directory is None or not self.directory.is_dir():
+            return
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def collect(self):
+        """Метрики всех процессов в текстовом формате Prometheus."""
+        self.flush()
+        merged = {}
+        for name, labels, value in self._series():
+            key = (name, tuple(map(tuple, labels)))
+            if isinstance(value, list):
+                current = merged.setdefault(key, [0] * len(value))
+                for index, item in enumerate(value):
+                    current[index] += item
+            else:
+                merged[key] = merged.get(key, 0) + value
+
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            series = sorted(
+                (labels, value)
+                for (series_name, labels), value in merged.items()
+                if series_name == name
+            )
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in series:
+                if kind == "counter":
+                    lines.append(
+                        f"{name}{format_labels(labels)} "
+                        f"{format_value(value)}"
+                    )
+                    continue
+                for bound, count in zip(
+                    (*buckets, math.inf), (*value[:-2], value[-1])
+                ):
+                    bucket_labels = (*labels, ("le", format_value(bound)))
+                    lines.append(
+                        f"{name}_bucket{format_labels(bucket_labels)} "
+                        f"{format_value(count)}"
+                    )
+                lines.append(
+                    f"{name}_sum{format_labels(labels)} "
+                    f"{format_value(value[-2])}"
+                )
+                lines.append(
+                    f"{name}_count{format_labels(labels)} "
+                    f"{format_value(value[-1])}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def _series(self):
+        """Значения из файлов всех процессов или только из памяти."""
+        if self.directory is None:
+            with self._lock:
+                return [
+                    [name, labels, value]
+                    for (name, labels), value in self._values.items()
+                ]
+        series = []
+        for path in self.directory.glob("*.json"):
+            try:
+                series.extend(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                # Файл удален при очистке каталога.
+                continue
+        return series
+
+    def _check_process(self):
+        """
+        Сброс значений в новом процессе.
+
+        После fork (gunicorn --preload) воркер не должен повторно
+        учитывать значения мастера. Поток записи запускается в
+        каждом процессе отдельно. Возвращает False в процессе,
+        исключенном skip_process.
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return not self._skipped
+        self._pid = pid
+        self._skipped = False
+        self._values = {}
+        self._dirty = False
+        if self.directory is not None:
+            threading.Thread(
+                target=self._flush_loop, name="metrics-flush", daemon=True
+            ).start()
+        return True
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+registry = MetricsRegistry(
+    directory=settings.METRICS_DIR,
+    flush_interval=settings.METRICS_FLUSH_INTERVAL,
+)
+atexit.register(registry.flush)
@@ -0,0 +1,285 @@
+import cProfile
+import hashlib
+import io
+import marshal
+import pstats
+import random
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.db import trace_queries, wrap_connections
+from core.instrumentation import (
+    RequestStats,
+    record_request,
+    request_stats,
+    view_labels,
+)
+from core.memory import MemorySample, record_sample, sampling_lock
+from core.models import RequestProfile
+from core.nplusone import NPlusOneDetector
+from core.routers import read_replica
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+STICKY_PREFIX = "primary"
+STICKY_COOKIE = "use_primary"
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_PARAM = "_profile"
+PROFILE_SUMMARY_LINES = 60
+SERVER_TIMING_PREFIX = "/api/"
+
+
+class MetricsMiddleware:
+    """
+    Показатели запроса для метрик.
+
+    Стоит первым в MIDDLEWARE: время запроса включает остальные
+    middleware. Во время запроса RequestStats доступен через
+    request_stats, число и время SQL-запросов считаются по всем
+    подключениям.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats(request)
+        token = request_stats.set(stats)
+        try:
+            with wrap_connections(stats.db_wrapper):
+                response = self.get_response(request)
+        finally:
+            request_stats.reset(token)
+        stats.finish()
+        record_request(request, response, stats)
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Заголовок Server-Timing в ответах API.
+
+    Разбивка времени запроса на аутентификацию, SQL, сериализацию и
+    рендеринг с отметками обращений к кэшам; видна во вкладке Network
+    инструментов разработчика. Включается настройкой SERVER_TIMING и
+    стоит в MIDDLEWARE сразу после MetricsMiddleware.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        stats = request_stats.get()
+        if stats is not None and request.path.startswith(
+            SERVER_TIMING_PREFIX
+        ):
+            response["Server-Timing"] = stats.server_timing()
+        return response
+
+
+class NPlusOneMiddleware:
+    """
+    Поиск N+1 в запросах при NPLUSONE_DETECTION «log» или «raise».
+
+    В режиме разработки (DEBUG) найденное пишется в журнал, в тестах
+    NPlusOneError отклоняет запрос, который добавил N+1.
+    """
+
+    def __init__(self, get_response):
+        if settings.NPLUSONE_DETECTION == "off":
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with NPlusOneDetector():
+            return self.get_response(request)
+
+
+class MemoryProfilingMiddleware:
+    """
+    Выборочный учет памяти запросов через tracemalloc.
+
+    Доля MEMORY_PROFILE_SAMPLE_RATE запросов выполняется под
+    tracemalloc (в процессе — не больше одного одновременно). Пик
+    памяти попадает в метрику foodgram_memory_peak_bytes, пики и
+    основные места выделений накапливаются по представлению и
+    действию в EndpointMemory (раздел «Память эндпоинтов» в админке).
+    """
+
+    def __init__(self, get_response):
+        if not settings.MEMORY_PROFILE_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            random.random() >= settings.MEMORY_PROFILE_SAMPLE_RATE
+            or tracemalloc.is_tracing()
+            or not sampling_lock.acquire(blocking=False)
+        ):
+            return self.get_response(request)
+        try:
+            with MemorySample() as sample:
+                response = self.get_response(request)
+        finally:
+            sampling_lock.release()
+        view, action = view_labels(request)
+        record_sample({"view": view, "action": action}, sample)
+        return response
+
+
+def sticky_key(request):
+    """Ключ «недавно писал» по заголовку Authorization или сессии."""
+    credentials = request.META.get("HTTP_AUTHORIZATION") or (
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not credentials:
+        return None
+    return f"{STICKY_PREFIX}:{hashlib.md5(credentials.encode()).hexdigest()}"
+
+
+class ReplicaMiddleware:
+    """
+    Маршрутизация чтения на реплики с read-your-writes.
+
+    Безопасный запрос читает с одной случайно выбранной реплики. После
+    небезопасного запроса клиент на REPLICA_STICKINESS_TIMEOUT секунд
+    читает из default, чтобы не увидеть отставшие данные. Отметка
+    хранится в кэше по токену или сессии (при нескольких процессах кэш
+    должен быть общим) и в cookie — она покрывает анонимную запись,
+    например регистрацию перед входом.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        key = sticky_key(request)
+        safe = request.method in SAFE_METHODS
+        sticky = STICKY_COOKIE in request.COOKIES or (
+            key is not None and cache.get(key) is not None
+        )
+        # Одна реплика на весь запрос: у разных реплик разное отставание,
+        # и COUNT, страница и документы списка разошлись бы.
+        token = read_replica.set(
+            random.choice(settings.DATABASE_REPLICAS)
+            if safe and not sticky else None
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            read_replica.reset(token)
+        if not safe:
+            timeout = settings.REPLICA_STICKINESS_TIMEOUT
+            if key is not None:
+                cache.set(key, True, timeout)
+            response.set_cookie(
+                STICKY_COOKIE, "1", max_age=timeout, httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+def profiling_requested(request):
+    """Запрошено ли профилирование заголовком X-Profile или ?_profile."""
+    return bool(
+        request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_PARAM)
+    )
+
+
+def staff_user(request):
+    """
+    Пользователь запроса, если он сотрудник.
+
+    Для API пользователь определяется аутентификацией DRF заранее, до
+    представления; вызывается только для запросов с флагом профилирования.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        drf_request = Request(
+            request,
+            authenticators=[
+                authentication() for authentication in authentication_classes
+            ],
+        )
+        try:
+            user = drf_request.user
+        except exceptions.APIException:
+            return None
+    return user if user.is_authenticated and user.is_staff else None
+
+
+class ProfilingMiddleware:
+    """
+    Профилирование запроса по требованию сотрудника.
+
+    Запрос с заголовком X-Profile или параметром ?_profile от сотрудника
+    выполняется под cProfile с журналом SQL, результат сохраняется в
+    RequestProfile (хранятся последние PROFILE_RETENTION). Остальные
+    запросы проходят без изменений.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling_requested(request):
+            return self.get_response(request)
+        user = staff_user(request)
+        if user is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with trace_queries() as queries:
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+        self._save(request, response, user, profiler, queries, duration_ms)
+        return response
+
+    @staticmethod
+    def _save(request, response, user, profiler, queries, duration_ms):
+        summary = io.StringIO()
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+            PROFILE_SUMMARY_LINES
+        )
+        profile = RequestProfile.objects.create(
+            user=user,
+            method=request.method,
+            path=request.get_full_path(),
+            status_code=response.status_code,
+            duration_ms=duration_ms,
+            query_count=len(queries),
+            query_time_ms=round(
+                sum(query["duration_ms"] for query in queries), 3
+            ),
+            summary=summary.getvalue(),
+            queries=queries,
+            # Формат pstats.dump_stats: файл открывается snakeviz и pstats.
+            stats=marshal.dumps(stats.stats),
+        )
+        stale = list(
+            RequestProfile.objects.exclude(pk=profile.pk).values_list(
+                "pk", flat=True
+            )[max(settings.PROFILE_RETENTION - 1, 0):]
+        )
+        if stale:
+            RequestProfile.objects.filter(pk__in=stale).delete()
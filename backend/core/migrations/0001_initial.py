@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата')),
+                ('method', models.CharField(max_length=16, verbose_name='Метод')),
+                ('path', models.TextField(verbose_name='Адрес')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Код ответа')),
+                ('duration_ms', models.FloatField(verbose_name='Время, мс')),
+                ('query_count', models.PositiveIntegerField(verbose_name='SQL-запросов')),
+                ('query_time_ms', models.FloatField(verbose_name='Время SQL, мс')),
+                ('summary', models.TextField(verbose_name='Сводка')),
+                ('queries', models.JSONField(default=list, verbose_name='SQL-запросы')),
+                ('stats', models.BinaryField(verbose_name='Статистика cProfile')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Профиль запроса',
+                'verbose_name_plural': 'Профили запросов',
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
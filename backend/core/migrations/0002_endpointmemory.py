@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EndpointMemory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view', models.CharField(max_length=255, verbose_name='Представление')),
+                ('action', models.CharField(max_length=64, verbose_name='Действие')),
+                ('samples', models.PositiveIntegerField(default=0, verbose_name='Запросов в выборке')),
+                ('peak_max', models.BigIntegerField(default=0, verbose_name='Максимальный пик, байт')),
+                ('peak_total', models.BigIntegerField(default=0, verbose_name='Сумма пиков, байт')),
+                ('sites', models.JSONField(default=dict, verbose_name='Места выделений')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Память эндпоинта',
+                'verbose_name_plural': 'Память эндпоинтов',
+                'ordering': ('-peak_max',),
+                'constraints': [models.UniqueConstraint(fields=('view', 'action'), name='unique_endpoint_memory')],
+            },
+        ),
+    ]
@@ -0,0 +1,157 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class RequestProfile(models.Model):
+    """Профиль одного запроса: статистика cProfile и журнал SQL."""
+
+    created_at = models.DateTimeField(
+        "Дата",
+        auto_now_add=True,
+        db_index=True,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Пользователь",
+    )
+    method = models.CharField(
+        "Метод",
+        max_length=16,
+    )
+    path = models.TextField(
+        "Адрес",
+    )
+    status_code = models.PositiveSmallIntegerField(
+        "Код ответа",
+    )
+    duration_ms = models.FloatField(
+        "Время, мс",
+    )
+    query_count = models.PositiveIntegerField(
+        "SQL-запросов",
+    )
+    query_time_ms = models.FloatField(
+        "Время SQL, мс",
+    )
+    summary = models.TextField(
+        "Сводка",
+    )
+    queries = models.JSONField(
+        "SQL-запросы",
+        default=list,
+    )
+    stats = models.BinaryField(
+        "Статистика cProfile",
+    )
+
+    class Meta:
+        verbose_name = "Профиль запроса"
+        verbose_name_plural = "Профили запросов"
+        ordering = ("-created_at",)
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} мс)"
+
+
+class EndpointMemory(models.Model):
+    """Выделения памяти по представлению и действию за выборку запросов."""
+
+    view = models.CharField(
+        "Представление",
+        max_length=255,
+    )
+    action = models.CharField(
+        "Действие",
+        max_length=64,
+    )
+    samples = models.PositiveIntegerField(
+        "Запросов в выборке",
+        default=0,
+    )
+    peak_max = models.BigIntegerField(
+        "Максимальный пик, байт",
+        default=0,
+    )
+    peak_total = models.BigIntegerField(
+        "Сумма пиков, байт",
+        default=0,
+    )
+    sites = models.JSONField(
+        "Места выделений",
+        default=dict,
+    )
+    updated_at = models.DateTimeField(
+        "Обновлено",
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = "Память эндпоинта"
+        verbose_name_plural = "Память эндпоинтов"
+        ordering = ("-peak_max",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=("view", "action"),
+                name="unique_endpoint_memory",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.view}.{self.action}"
+
+    @property
+    def peak_mean(self):
+        return self.peak_total / self.samples if self.samples else 0
+
+
+class Job(models.Model):
+    """Фоновая задача очереди core.jobs; выполненные задачи удаляются."""
+
+    name = models.CharField(
+        "Задача",
+        max_length=255,
+    )
+    kwargs = models.JSONField(
+        "Аргументы",
+        default=dict,
+    )
+    run_at = models.DateTimeField(
+        "Выполнить после",
+        default=timezone.now,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        "Попыток",
+        default=0,
+    )
+    last_error = models.TextField(
+        "Последняя ошибка",
+        blank=True,
+    )
+    failed_at = models.DateTimeField(
+        "Отменена после ошибок",
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        "Создана",
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ("run_at", "id")
+        indexes = [
+            models.Index(
+                fields=("run_at", "id"),
+                condition=models.Q(failed_at__isnull=True),
+                name="job_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}"
@@ -0,0 +1,155 @@
+import logging
+import sys
+from collections import Counter
+
+from django.conf import settings
+from rest_framework.fields import Field, SerializerMethodField
+from rest_framework.serializers import Serializer
+
+from core.db import app_stack, wrap_connections
+from core.instrumentation import request_stats
+
+SQL_PREVIEW_LENGTH = 300
+# Функции Django, из которых выполняется ленивая загрузка.
+LAZY_LOADERS = {
+    ("related_descriptors.py", "__get__"): "связанный объект",
+    ("query_utils.py", "__get__"): "отложенное поле",
+}
+
+logger = logging.getLogger("foodgram.nplusone")
+
+
+class NPlusOneError(Exception):
+    """Обнаружен N+1: одинаковые запросы повторяются в цикле."""
+
+
+def lazy_load(frame):
+    """Поле модели, которое загружается лениво в этом кадре, или None."""
+    code = frame.f_code
+    for (filename, function), kind in LAZY_LOADERS.items():
+        if code.co_filename.endswith(filename) and code.co_name == function:
+            descriptor = frame.f_locals.get("self")
+            field = getattr(descriptor, "field", None) or getattr(
+                descriptor, "related", None
+            )
+            if field is None:
+                return None
+            model = getattr(field, "model", None)
+            name = getattr(field, "name", "?")
+            model_name = model.__name__ if model is not None else "?"
+            return f"{model_name}.{name} ({kind})"
+    return None
+
+
+def serializer_field(frame):
+    """
+    Поле сериализатора DRF, в методе которого находится кадр.
+
+    Для SerializerMethodField кадр — метод get_<поле> самого
+    сериализатора, для остальных полей — метод поля.
+    """
+    instance = frame.f_locals.get("self")
+    if not isinstance(instance, Field):
+        return None
+    function = frame.f_code.co_name
+    if isinstance(instance, Serializer) and function.startswith("get_"):
+        field = instance.fields.get(function[len("get_"):])
+        if isinstance(field, SerializerMethodField):
+            return f"{type(instance).__name__}.{field.field_name}"
+    if instance.parent is None or not instance.field_name:
+        return None
+    return f"{type(instance.parent).__name__}.{instance.field_name}"
+
+
+def query_origin():
+    """
+    Источник запроса по стеку вызовов.
+
+    Ближайшие к запросу ленивая загрузка и поле сериализатора, а также
+    последний кадр из кода проекта.
+    """
+    lazy = field = None
+    frame = sys._getframe(1)
+    while frame is not None and not (lazy and field):
+        lazy = lazy or lazy_load(frame)
+        field = field or serializer_field(frame)
+        frame = frame.f_back
+    stack = app_stack()
+    return {
+        "lazy_load": lazy,
+        "serializer_field": field,
+        "code": stack[-1] if stack else None,
+    }
+
+
+class NPlusOneDetector:
+    """
+    Поиск N+1 внутри блока.
+
+    Считает одинаковые по тексту SELECT-запросы (параметры не
+    учитываются). Для запроса, повторившегося threshold раз, по стеку
+    определяются ленивая загрузка, поле сериализатора и строка кода.
+    При выходе из блока найденное пишется в журнал foodgram.nplusone
+    (mode="log") или вызывает NPlusOneError (mode="raise").
+
+        with NPlusOneDetector(mode="raise"):
+            RecipeSerializer(recipes, many=True).data
+    """
+
+    def __init__(self, mode=None, threshold=None):
+        self.mode = mode or settings.NPLUSONE_DETECTION
+        self.threshold = threshold or settings.NPLUSONE_THRESHOLD
+        self.counts = Counter()
+        self.origins = {}
+        self._wrapped = None
+
+    def __enter__(self):
+        self._wrapped = wrap_connections(self.wrapper)
+        self._wrapped.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._wrapped.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.report()
+        return False
+
+    def wrapper(self, execute, sql, params, many, context):
+        if not many and sql.lstrip()[:6].upper() == "SELECT":
+            key = (context["connection"].alias, sql)
+            self.counts[key] += 1
+            if self.counts[key] == self.threshold:
+                self.origins[key] = query_origin()
+        return execute(sql, params, many, context)
+
+    @property
+    def problems(self):
+        """Описания найденных N+1."""
+        stats = request_stats.get()
+        labels = stats.labels() if stats is not None else None
+        where = f" ({labels['view']}.{labels['action']})" if labels else ""
+        problems = []
+        for key, origin in self.origins.items():
+            lines = [
+                f"N+1: {self.counts[key]} одинаковых запросов{where}",
+                f"  SQL: {key[1][:SQL_PREVIEW_LENGTH]}",
+            ]
+            for title, name in (
+                ("Поле сериализатора", "serializer_field"),
+                ("Ленивая загрузка", "lazy_load"),
+                ("Код", "code"),
+            ):
+                if origin[name]:
+                    lines.append(f"  {title}: {origin[name]}")
+            problems.append("\n".join(lines))
+        return problems
+
+    def report(self):
+        problems = self.problems
+        if not problems:
+            return
+        if self.mode == "raise":
+            raise NPlusOneError("\n".join(problems))
+        if self.mode == "log":
+            for problem in problems:
+                logger.warning(problem)
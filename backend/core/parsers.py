@@ -0,0 +1,28 @@
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from core.renderers import JSONRenderer, orjson
+
+UTF8_ENCODINGS = {"utf-8", "utf8"}
+
+
+class JSONParser(parsers.JSONParser):
+    """JSON-парсер на orjson с откатом на стандартный json."""
+
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Разбор входящего JSON."""
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            data = stream.read()
+            if encoding.lower() not in UTF8_ENCODINGS:
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
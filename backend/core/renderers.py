@@ -0,0 +1,52 @@
+from rest_framework import renderers
+
+from core.instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if orjson is not None:
+    # Даты, время и dataclass передаются в encoder_class().default,
+    # чтобы формат совпадал со стандартным рендерером DRF.
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """JSON-рендерер на orjson с откатом на стандартный json."""
+
+    @timed("render")
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Сериализация данных в JSON."""
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context)
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            # Например, целые числа больше 64 бит.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Как и DRF, экранируем U+2028 и U+2029 для совместимости с JS.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -0,0 +1,34 @@
+from contextvars import ContextVar
+
+# Реплика, с которой читает текущий запрос, или None; выбирает
+# ReplicaMiddleware один раз на запрос, чтобы все его запросы видели
+# одно состояние данных. Вне запросов (команды, shell) чтение идет из
+# default.
+read_replica = ContextVar("read_replica", default=None)
+
+
+class ReplicaRouter:
+    """
+    Чтение с реплик для безопасных запросов, запись — в default.
+
+    Реплики перечислены в settings.DATABASE_REPLICAS; запрос читает с
+    реплики, которую выбрал ReplicaMiddleware. Если их нет или запрос
+    не разрешил чтение с реплики, все запросы идут в default.
+    """
+
+    def db_for_read(self, model, **hints):
+        # DatabaseCache хранит отметки записи и версии кэша: их чтение с
+        # отстающей реплики сломало бы read-your-writes.
+        if model._meta.app_label == "django_cache":
+            return None
+        return read_replica.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и default.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
@@ -0,0 +1,21 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Запуск тестов с поиском N+1 в режиме raise.
+
+    Тесты идут с DEBUG=False, и по умолчанию NPlusOneMiddleware был
+    бы выключен. Здесь режим raise включается для всего запуска:
+    запрос, добавивший N+1, завершается ошибкой NPlusOneError.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._nplusone = override_settings(NPLUSONE_DETECTION="raise")
+        self._nplusone.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._nplusone.disable()
+        super().teardown_test_environment(**kwargs)
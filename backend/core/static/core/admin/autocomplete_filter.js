@@ -0,0 +1,16 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // Выбор значения в AutocompleteFilter открывает changelist с фильтром.
+    $(function() {
+        $('.autocomplete-filter select').on('change', function() {
+            const queryString = this.closest('.autocomplete-filter').dataset.queryString;
+            const params = new URLSearchParams(queryString);
+            if (this.value) {
+                params.set(this.name, this.value);
+            }
+            window.location.search = params.toString();
+        });
+    });
+}
@@ -0,0 +1,47 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+
+# Файлы моложе, секунды, не удаляются: загрузка с тем же содержимым
+# может быть еще не зафиксирована в базе.
+MIN_AGE = 3600
+
+
+def content_hash(content):
+    """SHA-256 содержимого файла, прочитанного по частям."""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, называющее файлы по хешу содержимого.
+
+    Каталог (upload_to) и расширение сохраняются, имя заменяется на
+    SHA-256. Одинаковые файлы хранятся один раз: если файл с таким
+    хешем уже есть, запись пропускается, а время изменения файла
+    обновляется, чтобы удаление (не раньше MIN_AGE) не забрало его
+    у незафиксированной загрузки. Файл по имени никогда не
+    меняется, поэтому шлюз отдает /media/ с Cache-Control: immutable.
+    Один файл может принадлежать нескольким объектам: удаляет его
+    задача delete_images или команда cleanup_media после проверки
+    ссылок.
+    """
+
+    def _save(self, name, content):
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = posixpath.join(directory, content_hash(content) + extension)
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            # При одновременной записи того же файла FileSystemStorage
+            # выберет имя с суффиксом: лишняя копия, но не ошибка.
+            return super()._save(name, content)
+        return name
@@ -0,0 +1,121 @@
+import hashlib
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.test.utils import override_settings
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_safe
+
+from core.metrics import registry
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Формат схемы OpenAPI: файл и тип содержимого, как у drf_spectacular.
+SCHEMA_FORMATS = {
+    "yaml": ("openapi.yaml", "application/vnd.oai.openapi; charset=utf-8"),
+    "json": (
+        "openapi.json", "application/vnd.oai.openapi+json; charset=utf-8"
+    ),
+}
+
+
+def metrics(request):
+    """
+    Метрики в текстовом формате Prometheus.
+
+    Шлюз nginx этот адрес не проксирует: метрики доступны только
+    из внутренней сети, например сборщику Prometheus.
+    """
+    return HttpResponse(registry.collect(), content_type=METRICS_CONTENT_TYPE)
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """
+    Представление-класс, импортируемое при первом запросе.
+
+    Модуль представления не загружается вместе с URLconf, если
+    обращения к нему редки, а импорт дорогой.
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def spectacular_schema():
+    """
+    AutoSchema drf_spectacular вместо схемы DRF на время блока.
+
+    В настройках задана легкая схема DRF: DefaultRouter обращается к
+    атрибуту schema каждого ViewSet уже при загрузке URLconf, и
+    AutoSchema drf_spectacular импортировалась бы в каждом воркере.
+    """
+    with override_settings(
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_SCHEMA_CLASS": settings.SPECTACULAR_SCHEMA_CLASS,
+        }
+    ):
+        yield
+
+
+@lru_cache(maxsize=None)
+def prebuilt_schema(schema_format):
+    """Содержимое и ETag собранного файла схемы или None."""
+    filename, _ = SCHEMA_FORMATS[schema_format]
+    try:
+        content = (settings.OPENAPI_SCHEMA_DIR / filename).read_bytes()
+    except FileNotFoundError:
+        return None
+    return content, quote_etag(hashlib.md5(content).hexdigest())
+
+
+def schema_format(request):
+    """Формат схемы: параметр format, иначе JSON по заголовку Accept."""
+    requested = request.GET.get("format")
+    if requested is not None:
+        if requested not in SCHEMA_FORMATS:
+            raise Http404
+        return requested
+    return "json" if "json" in request.headers.get("Accept", "") else "yaml"
+
+
+schema_view = lazy_view("drf_spectacular.views.SpectacularAPIView")
+
+
+@require_safe
+def openapi_schema(request):
+    """
+    Схема OpenAPI из файла, собранного build_openapi_schema.
+
+    Файл читается один раз за процесс и отдается с ETag, поэтому
+    повторные запросы получают 304. Без файла (локальная разработка)
+    схема строится drf_spectacular на каждый запрос.
+    """
+    selected = schema_format(request)
+    prebuilt = prebuilt_schema(selected)
+    if prebuilt is None:
+        with spectacular_schema():
+            return schema_view(request)
+    content, etag = prebuilt
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            content, content_type=SCHEMA_FORMATS[selected][1]
+        )
+        response["Content-Disposition"] = (
+            f'inline; filename="schema.{selected}"'
+        )
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, no-cache"
+    patch_vary_headers(response, ("Accept",))
+    return response
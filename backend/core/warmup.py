@@ -0,0 +1,100 @@
+import logging
+from importlib import import_module
+
+from django.core.cache import caches
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import get_resolver, resolve
+
+from core import invalidation, metrics
+from core.localcache import short_links_cache
+from core.views import SCHEMA_FORMATS, prebuilt_schema
+from recipes.models import Ingredient, Recipe
+
+# Модули, которые иначе импортируются лениво первым запросом.
+MODULES = (
+    "api.recipes.serializers",
+    "api.users.serializers",
+    "djoser.serializers",
+    "djoser.views",
+    "rest_framework.authtoken.models",
+    "rest_framework.renderers",
+)
+# Сколько последних рецептов загрузить в кэш коротких ссылок.
+SHORT_LINKS = 5000
+
+logger = logging.getLogger("foodgram.warmup")
+
+
+def import_modules():
+    """Импорт URLconf со всеми представлениями и сериализаторов."""
+    get_resolver().url_patterns
+    for module in MODULES:
+        import_module(module)
+
+
+def call_view(path, **params):
+    """GET-запрос к представлению в обход middleware."""
+    request = RequestFactory().get(path, params)
+    match = resolve(request.path_info)
+    request.resolver_match = match
+    return match.func(request, *match.args, **match.kwargs)
+
+
+def prime_caches():
+    """
+    Заполнение кэшей процесса: теги, ингредиенты, короткие ссылки
+    и файлы схемы OpenAPI.
+
+    Теги и ингредиенты запрашиваются через представления, поэтому
+    заодно строятся поля сериализаторов и рендереры. Для поиска
+    ингредиентов загружаются ответы на первую букву названия.
+    """
+    call_view("/api/tags/")
+    call_view("/api/ingredients/")
+    names = Ingredient.objects.values_list("name", flat=True)
+    letters = {name[:1].lower() for name in names}
+    for letter in sorted(filter(str.isalpha, letters)):
+        call_view("/api/ingredients/", name=letter)
+    short_links_cache.set_many(
+        dict(
+            Recipe.objects.order_by("-pub_date").values_list(
+                "short_code", "id"
+            )[:SHORT_LINKS]
+        )
+    )
+    for schema_format in SCHEMA_FORMATS:
+        prebuilt_schema(schema_format)
+
+
+def open_connections():
+    """Подключение к базам, кэшам и событиям инвалидации до запросов."""
+    for connection in connections.all():
+        connection.ensure_connection()
+    for cache in caches.all():
+        cache.get("warmup")
+    invalidation.listener.ensure_started()
+
+
+def warm_up():
+    """
+    Прогрев процесса приложения.
+
+    При gunicorn --preload вызывается в мастере до fork: импорты и
+    кэши попадают в общие страницы памяти. Подключения к базе после
+    прогрева закрываются, их открывают воркеры (open_connections),
+    иначе процессы разделили бы одно соединение. Ошибки прогрева не
+    мешают запуску: они только записываются в журнал.
+    """
+    # Мастер запросы не обслуживает: события слушают и метрики
+    # записывают только воркеры, поток записи метрик в мастере не
+    # запускается.
+    invalidation.listener.skip_process()
+    metrics.registry.skip_process()
+    try:
+        import_modules()
+        prime_caches()
+    except Exception:
+        logger.exception("Ошибка прогрева приложения")
+    finally:
+        connections.close_all()
@@ -20,6 +20,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "djoser",
@@ -31,11 +32,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.ServerTimingMiddleware",
+    "core.middleware.NPlusOneMiddleware",
+    "core.middleware.MemoryProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.ReplicaMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -70,6 +77,102 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: "host" или "host:port" через запятую. Можно указать
+# тот же хост, что и DB_HOST, чтобы проверить маршрутизацию локально.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    host, _, port = replica.strip().partition(":")
+    alias = f"replica{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+# Сколько секунд после записи чтения пользователя идут в основную базу.
+REPLICA_STICKINESS_TIMEOUT = int(
+    os.getenv("REPLICA_STICKINESS_TIMEOUT", 10)
+)
+
+# Общий кэш воркеров gunicorn и run_jobs: версии зависимостей и
+# блокировки кэша ответов должны быть видны всем процессам. Кэш в
+# памяти процесса — только для отладки в одном процессе.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache"
+            if DEBUG
+            else "django.core.cache.backends.redis.RedisCache",
+        ),
+        "LOCATION": os.getenv(
+            "CACHE_LOCATION", "" if DEBUG else "redis://redis:6379/0"
+        ),
+    }
+}
+
+# Кэш ответов для анонимных пользователей (0 — выключен)
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 60))
+RESPONSE_CACHE_STALE_TIMEOUT = int(
+    os.getenv("RESPONSE_CACHE_STALE_TIMEOUT", 300)
+)
+RESPONSE_CACHE_LOCK_TIMEOUT = int(os.getenv("RESPONSE_CACHE_LOCK_TIMEOUT", 10))
+
+# Время жизни кэша процесса (теги, ингредиенты, короткие ссылки), секунды
+LOCAL_CACHE_TIMEOUT = int(os.getenv("LOCAL_CACHE_TIMEOUT", 300))
+
+# Каталог для метрик воркеров gunicorn (пусто — метрики одного процесса)
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 1))
+
+# Очередь фоновых задач (manage.py run_jobs): число попыток и задержка
+# перед первым повтором, секунды; каждый следующий повтор — вдвое позже
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", 5))
+JOBS_RETRY_DELAY = float(os.getenv("JOBS_RETRY_DELAY", 10))
+# Выполнять задачи в процессе после фиксации транзакции, без воркера
+JOBS_EAGER = os.getenv("JOBS_EAGER", "False").lower() == "true"
+
+# Схема OpenAPI, собранная командой build_openapi_schema при сборке образа
+OPENAPI_SCHEMA_DIR = Path(
+    os.getenv("OPENAPI_SCHEMA_DIR", BASE_DIR / "schema")
+)
+
+# Заголовок Server-Timing с разбивкой времени в ответах API
+SERVER_TIMING = os.getenv("SERVER_TIMING", "False").lower() == "true"
+
+# Порог журнала медленных SQL-запросов, мс (0 — выключен)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))
+# Комментарий с view и action в каждом SQL-запросе (sqlcommenter)
+SQL_COMMENTER = os.getenv("SQL_COMMENTER", "False").lower() == "true"
+
+# Поиск N+1: off, log (по умолчанию при DEBUG) или raise (включает
+# TEST_RUNNER на время тестов)
+NPLUSONE_DETECTION = os.getenv(
+    "NPLUSONE_DETECTION", "log" if DEBUG else "off"
+).lower()
+# Сколько одинаковых запросов за HTTP-запрос считать N+1
+NPLUSONE_THRESHOLD = int(os.getenv("NPLUSONE_THRESHOLD", 5))
+
+# Запуск тестов: поиск N+1 в режиме raise
+TEST_RUNNER = "core.runner.TestRunner"
+
+# Доля запросов для учета памяти через tracemalloc (0 — выключен)
+MEMORY_PROFILE_SAMPLE_RATE = float(
+    os.getenv("MEMORY_PROFILE_SAMPLE_RATE", 0)
+)
+# Сколько мест выделений брать из одного запроса
+MEMORY_PROFILE_TOP = int(os.getenv("MEMORY_PROFILE_TOP", 10))
+
+# Сколько последних профилей запросов (X-Profile) хранить; текущий
+# профиль сохраняется всегда, даже при 0
+PROFILE_RETENTION = int(os.getenv("PROFILE_RETENTION", 50))
+
 AUTH_USER_MODEL = "users.User"
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -102,6 +205,18 @@ STATIC_ROOT = os.path.join(BASE_DIR, "..", "backend_static", "static")
 # Медиа файлы
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# Адрес медиа в ответах API (например, CDN); по умолчанию хост запроса
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL", "")
+
+# Медиа называются по хешу содержимого и не перезаписываются
+STORAGES = {
+    "default": {
+        "BACKEND": "core.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -110,13 +225,31 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.AllowAny",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "core.authentication.TokenAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     "DEFAULT_PAGINATION_CLASS": "core.pagination.PageNumberPagination",
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # AutoSchema drf_spectacular подключается только на время сборки
+    # схемы (core.views.spectacular_schema): импорт drf_spectacular
+    # не нужен воркерам и замедлял бы их запуск.
+    "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.openapi.AutoSchema",
+}
+
+SPECTACULAR_SCHEMA_CLASS = "drf_spectacular.openapi.AutoSchema"
+SPECTACULAR_SETTINGS = {
+    # Схему проверяет build_openapi_schema при сборке образа.
+    "ENABLE_DJANGO_DEPLOY_CHECK": False,
 }
 
 DJOSER = {
@@ -139,3 +272,27 @@ DJOSER = {
 }
 
 CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "verbose": {
+            "format": "{asctime} {levelname} {name} {message}",
+            "style": "{",
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "verbose",
+        },
+    },
+    "loggers": {
+        "foodgram": {
+            "handlers": ["console"],
+            "level": os.getenv("LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
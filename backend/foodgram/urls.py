@@ -2,16 +2,21 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+from core.views import lazy_view, metrics, openapi_schema
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics, name="metrics"),
     path("api/", include("api.users.urls")),
     path("api/", include("api.recipes.urls")),
-    path("api/docs/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/docs/", openapi_schema, name="schema"),
     path(
         "api/docs/swagger/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
+        lazy_view(
+            "drf_spectacular.views.SpectacularSwaggerView",
+            url_name="schema",
+        ),
         name="swagger-ui",
     ),
 ]
@@ -0,0 +1,98 @@
+"""
+Настройки gunicorn.
+
+Приложение загружается в мастере (preload_app) и прогревается до
+fork: импорты, URLconf и кэши процесса оказываются в общих страницах
+памяти. Сборщик мусора в мастере выключен, а перед fork объекты
+замораживаются (gc.freeze), чтобы сборка мусора в воркерах не
+копировала эти страницы. Число воркеров подбирается по ядрам и
+памяти контейнера.
+"""
+import gc
+import os
+from pathlib import Path
+
+# Память на один воркер для расчета их числа, МиБ.
+WORKER_MEMORY_MB = int(os.getenv("GUNICORN_WORKER_MEMORY_MB", 256))
+
+
+def cpu_count():
+    """Доступные ядра с учетом affinity и квоты cgroup v2."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota != "max":
+        cpus = min(cpus, max(1, int(quota) // int(period)))
+    return cpus
+
+
+def memory_limit():
+    """Лимит памяти cgroup (v2 или v1) или объем памяти машины, байт."""
+    for path in (
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ):
+        try:
+            value = Path(path).read_text().strip()
+        except OSError:
+            continue
+        # В cgroup v1 отсутствие лимита — очень большое число.
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError):
+        return None
+
+
+def default_workers():
+    """2 × ядра + 1, но не больше, чем помещается в память."""
+    workers = 2 * cpu_count() + 1
+    memory = memory_limit()
+    if memory:
+        workers = min(workers, memory // (WORKER_MEMORY_MB << 20))
+    return max(1, workers)
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 0)) or default_workers()
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+preload_app = True
+# Перезапуск воркера через столько запросов ограничивает рост памяти.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+
+# Без сборок мусора в мастере при загрузке приложения в страницах
+# памяти не остается «дыр» от освобожденных объектов.
+gc.disable()
+
+
+def on_starting(server):
+    """Очистка каталога метрик от файлов прошлого запуска."""
+    directory = os.getenv("METRICS_DIR")
+    if directory and os.path.isdir(directory):
+        for path in Path(directory).glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+def when_ready(server):
+    """Прогрев в мастере и заморозка объектов перед запуском воркеров."""
+    from core.warmup import warm_up
+
+    warm_up()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Воркер: сборщик мусора и подключения к базе и кэшам."""
+    gc.enable()
+    from core.warmup import open_connections
+
+    open_connections()
@@ -1,5 +1,8 @@
 from django.contrib import admin
 
+from core.admin import AutocompleteFilter, ScalableAdminMixin, related_count
+from core.localcache import ingredients_cache
+from recipes.documents import refresh_recipe_documents
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -16,6 +19,7 @@ class IngredientInRecipeInline(admin.TabularInline):
     model = IngredientInRecipe
     extra = 1
     min_num = 1
+    autocomplete_fields = ("ingredient",)
 
 
 @admin.register(Tag)
@@ -31,15 +35,49 @@ class TagAdmin(admin.ModelAdmin):
     search_fields = ("name", "slug")
     prepopulated_fields = {"slug": ("name",)}
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            recipes_count=related_count(Recipe.tags.through.objects, "tag")
+        )
+
     def get_recipes_count(self, obj):
         """Количество рецептов с этим тегом."""
-        return obj.recipes.count()
+        return obj.recipes_count
 
     get_recipes_count.short_description = "Рецептов"
 
 
+class MeasurementUnitFilter(admin.SimpleListFilter):
+    """
+    Фильтр по единице измерения.
+
+    Список единиц берется из кэша ингредиентов, который очищается при
+    их изменении: стандартный фильтр выполнял SELECT DISTINCT по всей
+    таблице при каждом открытии списка.
+    """
+
+    title = "Единица измерения"
+    parameter_name = "measurement_unit"
+
+    def lookups(self, request, model_admin):
+        units = ingredients_cache.get_or_set(
+            "measurement_units",
+            lambda: list(
+                Ingredient.objects.order_by("measurement_unit")
+                .values_list("measurement_unit", flat=True)
+                .distinct()
+            ),
+        )
+        return [(unit, unit) for unit in units]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(measurement_unit=self.value())
+        return queryset
+
+
 @admin.register(Ingredient)
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(ScalableAdminMixin, admin.ModelAdmin):
     """Админка для ингредиентов."""
 
     list_display = (
@@ -48,18 +86,25 @@ class IngredientAdmin(admin.ModelAdmin):
         "measurement_unit",
         "get_recipes_count",
     )
-    list_filter = ("measurement_unit",)
+    list_filter = (MeasurementUnitFilter,)
     search_fields = ("name",)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            recipes_count=related_count(
+                IngredientInRecipe.objects, "ingredient"
+            )
+        )
+
     def get_recipes_count(self, obj):
         """Количество рецептов с этим ингредиентом."""
-        return obj.recipes.count()
+        return obj.recipes_count
 
     get_recipes_count.short_description = "Рецептов"
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(ScalableAdminMixin, admin.ModelAdmin):
     """Админка для рецептов."""
 
     list_display = (
@@ -73,9 +118,10 @@ class RecipeAdmin(admin.ModelAdmin):
     )
     list_filter = (
         "tags",
-        "author",
+        ("author", AutocompleteFilter),
         "pub_date",
     )
+    list_select_related = ("author",)
     search_fields = (
         "name",
         "author__username",
@@ -89,28 +135,47 @@ class RecipeAdmin(admin.ModelAdmin):
         "get_shopping_cart_count",
     )
     filter_horizontal = ("tags",)
+    autocomplete_fields = ("author",)
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related("tags")
+            .annotate(
+                favorites_count=related_count(Favorite.objects, "recipe"),
+                shopping_cart_count=related_count(
+                    ShoppingCart.objects, "recipe"
+                ),
+            )
+        )
+
+    def save_related(self, request, form, formsets, change):
+        """Пересборка документа после сохранения тегов и ингредиентов."""
+        super().save_related(request, form, formsets, change)
+        refresh_recipe_documents([form.instance.pk])
 
     def get_favorites_count(self, obj):
         """Количество добавлений в избранное."""
-        return obj.favorites.count()
+        return obj.favorites_count
 
     get_favorites_count.short_description = "В избранном"
 
     def get_shopping_cart_count(self, obj):
         """Количество добавлений в список покупок."""
-        return obj.shopping_cart.count()
+        return obj.shopping_cart_count
 
     get_shopping_cart_count.short_description = "В списке покупок"
 
     def get_tags_display(self, obj):
         """Отображение тегов через запятую."""
-        return ", ".join(obj.tags.values_list("name", flat=True))
+        return ", ".join(tag.name for tag in obj.tags.all())
 
     get_tags_display.short_description = "Теги"
 
 
 @admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
+class FavoriteAdmin(ScalableAdminMixin, admin.ModelAdmin):
     """Админка для избранного."""
 
     list_display = (
@@ -120,18 +185,20 @@ class FavoriteAdmin(admin.ModelAdmin):
         "recipe__author",
     )
     list_filter = (
-        "user",
-        "recipe",
+        ("user", AutocompleteFilter),
+        ("recipe", AutocompleteFilter),
     )
+    list_select_related = ("user", "recipe__author")
     search_fields = (
         "user__username",
         "user__email",
         "recipe__name",
     )
+    autocomplete_fields = ("user", "recipe")
 
 
 @admin.register(ShoppingCart)
-class ShoppingCartAdmin(admin.ModelAdmin):
+class ShoppingCartAdmin(ScalableAdminMixin, admin.ModelAdmin):
     """Админка для списка покупок."""
 
     list_display = (
@@ -141,11 +208,13 @@ class ShoppingCartAdmin(admin.ModelAdmin):
         "recipe__author",
     )
     list_filter = (
-        "user",
-        "recipe",
+        ("user", AutocompleteFilter),
+        ("recipe", AutocompleteFilter),
     )
+    list_select_related = ("user", "recipe__author")
     search_fields = (
         "user__username",
         "user__email",
         "recipe__name",
     )
+    autocomplete_fields = ("user", "recipe")
@@ -7,3 +7,6 @@ class RecipesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "recipes"
     verbose_name = "Рецепты"
+
+    def ready(self):
+        from recipes import signals  # noqa: F401
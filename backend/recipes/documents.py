@@ -0,0 +1,98 @@
+from itertools import islice
+
+from django.utils import timezone
+
+from core.cache import invalidate
+from recipes.models import IngredientInRecipe, Recipe
+
+DOCUMENTS_BATCH_SIZE = 500
+
+
+def build_recipe_documents(recipe_ids) -> dict:
+    """
+    Сборка документов рецептов.
+
+    Документ хранит не зависящую от пользователя часть представления
+    рецепта. Теги, автор и ингредиенты лежат списками значений, так как
+    JSONB не сохраняет порядок ключей.
+    """
+    documents = {
+        recipe_id: {
+            "id": recipe_id,
+            "tags": [],
+            "author": list(author),
+            "ingredients": [],
+            "name": name,
+            "image": image,
+            "text": text,
+            "cooking_time": cooking_time,
+        }
+        for recipe_id, name, image, text, cooking_time, *author in (
+            Recipe.objects.filter(pk__in=recipe_ids).values_list(
+                "id",
+                "name",
+                "image",
+                "text",
+                "cooking_time",
+                "author_id",
+                "author__email",
+                "author__username",
+                "author__first_name",
+                "author__last_name",
+                "author__avatar",
+            )
+        )
+    }
+    tags = (
+        Recipe.tags.through.objects.filter(recipe_id__in=documents)
+        .order_by("tag__name")
+        .values_list("recipe_id", "tag_id", "tag__name", "tag__slug")
+    )
+    for recipe_id, *tag in tags:
+        documents[recipe_id]["tags"].append(tag)
+    ingredients = (
+        IngredientInRecipe.objects.filter(recipe_id__in=documents)
+        .order_by("id")
+        .values_list(
+            "recipe_id",
+            "ingredient_id",
+            "ingredient__name",
+            "ingredient__measurement_unit",
+            "amount",
+        )
+    )
+    for recipe_id, *ingredient in ingredients:
+        documents[recipe_id]["ingredients"].append(ingredient)
+    return documents
+
+
+def store_recipe_documents(documents, updated_at=None):
+    """
+    Сохранение собранных документов рецептов.
+
+    Если передан updated_at, им же отмечается изменение рецептов.
+    """
+    fields = ["document"] if updated_at is None else [
+        "document", "updated_at"
+    ]
+    Recipe.objects.bulk_update(
+        [
+            Recipe(pk=recipe_id, document=document, updated_at=updated_at)
+            for recipe_id, document in documents.items()
+        ],
+        fields,
+    )
+
+
+def refresh_recipe_documents(recipe_ids):
+    """
+    Пересборка и сохранение документов рецептов пачками.
+
+    Кэшированные ответы с этими рецептами инвалидируются.
+    """
+    recipe_ids = iter(recipe_ids)
+    while batch := list(islice(recipe_ids, DOCUMENTS_BATCH_SIZE)):
+        store_recipe_documents(
+            build_recipe_documents(batch), updated_at=timezone.now()
+        )
+        invalidate("recipes", *(f"recipe:{pk}" for pk in batch))
@@ -0,0 +1,53 @@
+import time
+
+from django.core.files.storage import default_storage
+
+from core.jobs import job
+from core.storage import MIN_AGE
+from recipes.documents import refresh_recipe_documents
+from recipes.models import Recipe
+from users.models import User
+
+
+@job
+def refresh_documents(recipe_ids):
+    """Пересборка документов рецептов по списку идентификаторов."""
+    refresh_recipe_documents(recipe_ids)
+
+
+@job
+def refresh_related_documents(lookup, pk):
+    """Пересборка документов рецептов автора, тега или ингредиента."""
+    refresh_recipe_documents(
+        Recipe.objects.filter(**{lookup: pk})
+        .order_by()
+        .values_list("id", flat=True)
+        .iterator()
+    )
+
+
+@job
+def delete_images(names):
+    """
+    Удаление картинок удаленных рецептов и аватаров из хранилища.
+
+    Файл, на который еще ссылается другой рецепт или пользователь
+    (например, общая заглушка generate_data), остается. Файл моложе
+    MIN_AGE тоже остается: его могла только что повторно загрузить
+    незафиксированная транзакция. Такие файлы позже удалит
+    cleanup_media.
+    """
+    used = set(
+        Recipe.objects.filter(image__in=names).values_list("image", flat=True)
+    )
+    used.update(
+        User.objects.filter(avatar__in=names).values_list("avatar", flat=True)
+    )
+    cutoff = time.time() - MIN_AGE
+    for name in set(names) - used:
+        try:
+            modified = default_storage.get_modified_time(name).timestamp()
+        except FileNotFoundError:
+            continue
+        if modified < cutoff:
+            default_storage.delete(name)
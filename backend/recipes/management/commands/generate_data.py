@@ -0,0 +1,363 @@
+import random
+import string
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.cache import invalidate
+from core.db import insert_rows, reset_sequences
+from recipes.models import (
+    SHORT_CODE_LENGTH,
+    Favorite,
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Subscription, User
+
+BATCH_SIZE = 10000
+# Чем больше показатель, тем сильнее популярность смещена к началу.
+POPULARITY_SKEW = 3
+MAX_RELATIONS_PER_USER = 1000
+DEFAULT_TAGS = (
+    ("Завтрак", "breakfast"),
+    ("Обед", "lunch"),
+    ("Ужин", "dinner"),
+    ("Десерт", "dessert"),
+    ("Выпечка", "bakery"),
+)
+DISHES = (
+    "Салат", "Суп", "Омлет", "Пирог", "Рагу", "Запеканка", "Паста",
+    "Каша", "Плов", "Ризотто", "Блины", "Котлеты", "Сэндвич", "Крем-суп",
+)
+FILLINGS = (
+    "курицей", "грибами", "сыром", "овощами", "говядиной", "рыбой",
+    "тыквой", "шпинатом", "ягодами", "яблоками", "фасолью", "креветками",
+)
+SENTENCES = (
+    "Нарежьте продукты небольшими кусочками.",
+    "Разогрейте сковороду и добавьте немного масла.",
+    "Обжаривайте на среднем огне до золотистого цвета.",
+    "Посолите и поперчите по вкусу.",
+    "Перемешайте и накройте крышкой.",
+    "Готовьте до мягкости, периодически помешивая.",
+    "Подавайте горячим, посыпав зеленью.",
+    "Дайте настояться несколько минут перед подачей.",
+)
+AMOUNTS = (1, 2, 3, 4, 5, 10, 50, 100, 150, 200, 250, 300, 500)
+SHORT_CODE_ALPHABET = string.ascii_letters + string.digits
+# Взаимно просто с длиной алфавита: номер -> код без коллизий.
+SHORT_CODE_MULTIPLIER = 2654435761
+SHORT_CODE_SPACE = len(SHORT_CODE_ALPHABET) ** SHORT_CODE_LENGTH
+PLACEHOLDER_NAME = "recipes/images/placeholder.png"
+# PNG 1x1 пиксель.
+PLACEHOLDER_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010802000000"
+    "907753de0000000c49444154789c63f8ffff3f0005fe02fe0def46b800"
+    "00000049454e44ae426082"
+)
+
+
+def skewed_index(rng, size):
+    """Индекс в диапазоне [0, size) со степенным распределением."""
+    return int(size * rng.random() ** POPULARITY_SKEW)
+
+
+def skewed_sample(rng, size, count):
+    """count различных индексов со степенным распределением."""
+    count = min(count, size // 2 or size)
+    sample = set()
+    while len(sample) < count:
+        sample.add(skewed_index(rng, size))
+    return sample
+
+
+def heavy_tail_count(rng, mean):
+    """Количество связей пользователя с тяжелым хвостом и средним mean."""
+    return min(
+        int(mean * (rng.paretovariate(2) - 1)), MAX_RELATIONS_PER_USER
+    )
+
+
+def short_code(number):
+    """Уникальный короткий код, вычисляемый по номеру рецепта."""
+    value = number * SHORT_CODE_MULTIPLIER % SHORT_CODE_SPACE
+    chars = []
+    for _ in range(SHORT_CODE_LENGTH):
+        value, index = divmod(value, len(SHORT_CODE_ALPHABET))
+        chars.append(SHORT_CODE_ALPHABET[index])
+    return "".join(chars)
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует воспроизводимый синтетический набор данных для "
+        "нагрузочного тестирования: пользователей, рецепты, избранное, "
+        "списки покупок и подписки. Ингредиенты должны быть загружены "
+        "заранее командой load_ingredients."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=1000,
+            help="Количество пользователей.",
+        )
+        parser.add_argument(
+            "--recipes", type=int, default=10000,
+            help="Количество рецептов.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Зерно генератора случайных чисел.",
+        )
+        parser.add_argument(
+            "--max-ingredients", type=int, default=12,
+            help="Максимальное число ингредиентов в рецепте.",
+        )
+        parser.add_argument(
+            "--favorites", type=float, default=20,
+            help="Среднее число избранных рецептов у пользователя.",
+        )
+        parser.add_argument(
+            "--shopping-cart", type=float, default=3,
+            help="Среднее число рецептов в списке покупок.",
+        )
+        parser.add_argument(
+            "--subscriptions", type=float, default=5,
+            help="Среднее число подписок у пользователя.",
+        )
+        parser.add_argument(
+            "--days", type=int, default=365,
+            help="Период, за который распределяются даты публикации.",
+        )
+        parser.add_argument(
+            "--password", default="password",
+            help="Пароль всех созданных пользователей.",
+        )
+        parser.add_argument(
+            "--images", action="store_true",
+            help="Сохранить картинку-заглушку и указать ее в рецептах.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=BATCH_SIZE,
+            help="Размер пачки строк для вставки.",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("Нужен хотя бы один пользователь.")
+        if options["recipes"] < 0 or options["batch_size"] < 1:
+            raise CommandError("Некорректные параметры генерации.")
+        self.seed = options["seed"]
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        self.started = time.monotonic()
+
+        ingredient_ids = list(
+            Ingredient.objects.order_by("id").values_list("id", flat=True)
+        )
+        if not ingredient_ids:
+            raise CommandError(
+                "Нет ингредиентов. Сначала выполните load_ingredients."
+            )
+        with transaction.atomic():
+            tag_ids = self._tag_ids()
+            # Популярность ингредиентов и тегов не зависит от их id.
+            self._rng("popularity").shuffle(ingredient_ids)
+            self._rng("popularity").shuffle(tag_ids)
+            image = self._placeholder() if options["images"] else ""
+
+            first_user_id = self._next_id(User)
+            first_recipe_id = self._next_id(Recipe)
+            self._generate_users(
+                first_user_id, options["users"], options["password"],
+                options["days"],
+            )
+            self._generate_recipes(
+                first_recipe_id, options["recipes"], first_user_id,
+                options["users"], tag_ids, ingredient_ids,
+                options["max_ingredients"], image, options["days"],
+            )
+            reset_sequences(User, Recipe)
+            self._generate_relations(
+                first_user_id, options["users"], first_recipe_id,
+                options["recipes"], options,
+            )
+            invalidate("recipes")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово за {time.monotonic() - self.started:.1f} с."
+            )
+        )
+
+    def _rng(self, stage):
+        """
+        Отдельный генератор на каждый этап.
+
+        Смена параметров одного этапа не меняет данные остальных.
+        """
+        return random.Random(f"{self.seed}:{stage}")
+
+    @staticmethod
+    def _next_id(model):
+        return (model.objects.aggregate(Max("id"))["id__max"] or 0) + 1
+
+    @staticmethod
+    def _tag_ids():
+        if not Tag.objects.exists():
+            Tag.objects.bulk_create(
+                [Tag(name=name, slug=slug) for name, slug in DEFAULT_TAGS]
+            )
+        return list(Tag.objects.order_by("id").values_list("id", flat=True))
+
+    @staticmethod
+    def _placeholder():
+        # Повторное сохранение того же файла хранилище пропускает.
+        return default_storage.save(
+            PLACEHOLDER_NAME, ContentFile(PLACEHOLDER_PNG)
+        )
+
+    def _report(self, label, count):
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(f"{label}: {count} ({elapsed:.1f} с)")
+
+    def _batches(self, start, count):
+        """Диапазоны id пачками по batch_size."""
+        for offset in range(0, count, self.batch_size):
+            yield range(
+                start + offset,
+                start + min(offset + self.batch_size, count),
+            )
+
+    def _generate_users(self, first_id, count, password, days):
+        rng = self._rng("users")
+        # Хэш пароля считается один раз: это самая дорогая часть.
+        password = make_password(password)
+        columns = (
+            "id", "password", "is_superuser", "username", "first_name",
+            "last_name", "email", "is_staff", "is_active", "date_joined",
+            "updated_at", "relations_updated_at",
+        )
+        for ids in self._batches(first_id, count):
+            rows = []
+            for user_id in ids:
+                joined = self.now - timedelta(
+                    days=days * 2 * rng.random()
+                )
+                rows.append((
+                    user_id, password, False, f"user{user_id}",
+                    f"Имя{user_id}", f"Фамилия{user_id}",
+                    f"user{user_id}@example.com", False, True,
+                    joined, joined, joined,
+                ))
+            insert_rows(User._meta.db_table, columns, rows, self.batch_size)
+            self._report("Пользователи", ids[-1] - first_id + 1)
+
+    def _generate_recipes(
+        self, first_id, count, first_user_id, users, tag_ids,
+        ingredient_ids, max_ingredients, image, days,
+    ):
+        rng = self._rng("recipes")
+        recipe_columns = (
+            "id", "author_id", "name", "image", "text", "cooking_time",
+            "pub_date", "updated_at", "short_code", "document",
+        )
+        for ids in self._batches(first_id, count):
+            codes = {recipe_id: short_code(recipe_id) for recipe_id in ids}
+            # Коды старых рецептов случайны и могут совпасть с новыми.
+            for recipe_id, code in Recipe.objects.filter(
+                short_code__in=codes.values()
+            ).values_list("id", "short_code"):
+                for new_id in ids:
+                    if codes[new_id] == code:
+                        codes[new_id] = Recipe().generate_short_code()
+            recipes, tags, ingredients = [], [], []
+            for recipe_id in ids:
+                published = self.now - timedelta(days=days * rng.random())
+                recipes.append((
+                    recipe_id,
+                    first_user_id + skewed_index(rng, users),
+                    f"{rng.choice(DISHES)} с {rng.choice(FILLINGS)}",
+                    image,
+                    " ".join(rng.choices(SENTENCES, k=rng.randint(2, 6))),
+                    rng.choice((5, 10, 15, 20, 30, 45, 60, 90, 120)),
+                    published,
+                    published,
+                    codes[recipe_id],
+                    {},
+                ))
+                tags.extend(
+                    (recipe_id, tag_ids[index])
+                    for index in skewed_sample(
+                        rng, len(tag_ids), rng.randint(1, 3)
+                    )
+                )
+                ingredients.extend(
+                    (recipe_id, ingredient_ids[index], rng.choice(AMOUNTS))
+                    for index in skewed_sample(
+                        rng, len(ingredient_ids),
+                        rng.randint(1, max_ingredients),
+                    )
+                )
+            insert_rows(
+                Recipe._meta.db_table, recipe_columns, recipes,
+                self.batch_size,
+            )
+            insert_rows(
+                Recipe.tags.through._meta.db_table,
+                ("recipe_id", "tag_id"),
+                tags,
+                self.batch_size,
+            )
+            insert_rows(
+                IngredientInRecipe._meta.db_table,
+                ("recipe_id", "ingredient_id", "amount"),
+                ingredients,
+                self.batch_size,
+            )
+            self._report("Рецепты", ids[-1] - first_id + 1)
+
+    def _generate_relations(
+        self, first_user_id, users, first_recipe_id, recipes, options
+    ):
+        relations = []
+        if recipes:
+            relations += [
+                (Favorite, "recipe_id", first_recipe_id, recipes,
+                 options["favorites"]),
+                (ShoppingCart, "recipe_id", first_recipe_id, recipes,
+                 options["shopping_cart"]),
+            ]
+        if users > 1:
+            relations.append(
+                (Subscription, "author_id", first_user_id, users,
+                 options["subscriptions"])
+            )
+        for model, column, first_target, targets, mean in relations:
+            rng = self._rng(model._meta.model_name)
+            inserted = 0
+            for ids in self._batches(first_user_id, users):
+                rows = []
+                for user_id in ids:
+                    rows.extend(
+                        (user_id, first_target + index)
+                        for index in skewed_sample(
+                            rng, targets, heavy_tail_count(rng, mean)
+                        )
+                        if first_target + index != user_id
+                    )
+                inserted += insert_rows(
+                    model._meta.db_table, ("user_id", column), rows,
+                    self.batch_size,
+                )
+            self._report(model._meta.verbose_name_plural, inserted)
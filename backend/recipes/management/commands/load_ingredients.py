@@ -1,84 +1,246 @@
+import codecs
 import csv
+import json
+import re
+import time
+from itertools import islice
 from pathlib import Path
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 
-from recipes.models import Ingredient
+from core.db import copy_rows
+from recipes.models import (
+    INGREDIENT_NAME_MAX_LENGTH,
+    MEASUREMENT_UNIT_MAX_LENGTH,
+    Ingredient,
+)
 
 CSV_PATH = Path("/app/data/ingredients.csv")
-ENCODINGS = ["utf-8-sig", "utf-8", "cp1251", "windows-1251", "iso-8859-1"]
+ENCODINGS = ["utf-8-sig", "utf-8", "cp1251", "iso-8859-1"]
+ENCODING_SAMPLE_SIZE = 64 * 1024
+JSON_CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 10000
+MAX_REPORTED_ERRORS = 100
+HEADER_UNITS = {"unit", "measurement_unit", "единица"}
+JSON_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def detect_encoding(path: Path):
+    """Определение кодировки файла по его началу."""
+    with path.open("rb") as f:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+    for encoding in ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample, final=False)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return None
+
+
+def iter_csv_rows(f):
+    """Строки CSV в виде (номер строки, name, measurement_unit)."""
+    reader = csv.reader(f)
+    for row in reader:
+        if not row:
+            continue
+        yield reader.line_num, row[0], row[1] if len(row) > 1 else ""
+
+
+def iter_json_rows(f):
+    """
+    Потоковое чтение JSON-массива объектов ингредиентов.
+
+    Объекты разбираются по одному, файл целиком в память не читается.
+    Номер строки — порядковый номер объекта в массиве.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(JSON_CHUNK_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("ожидается JSON-массив")
+    position = 1
+    number = 0
+    while True:
+        position = JSON_SEPARATORS.match(buffer, position).end()
+        if buffer.startswith("]", position):
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = f.read(JSON_CHUNK_SIZE)
+            if not chunk:
+                raise
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        number += 1
+        if not isinstance(item, dict):
+            item = {}
+        yield number, item.get("name"), item.get("measurement_unit")
 
 
 class Command(BaseCommand):
     help = (
-        "Загружает ингредиенты из /app/data/ingredients.csv "
-        "(формат: name,measurement_unit)"
+        "Загружает ингредиенты из CSV (name,measurement_unit) или JSON "
+        "(массив объектов с полями name и measurement_unit). Повторный "
+        "запуск не создает дубликатов."
     )
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            type=Path,
+            default=CSV_PATH,
+            help=f"Путь к файлу (по умолчанию {CSV_PATH}).",
+        )
+        parser.add_argument(
+            "--format",
+            choices=("csv", "json"),
+            help="Формат файла; по умолчанию определяется по расширению.",
+        )
+        parser.add_argument(
+            "--encoding",
+            help="Кодировка файла; по умолчанию определяется автоматически.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Размер пачки строк для загрузки.",
+        )
+
     def handle(self, *args, **options):
-        if not CSV_PATH.exists():
-            self.stdout.write(self.style.ERROR(f"Файл не найден: {CSV_PATH}"))
-            return
+        path = options["path"]
+        if not path.exists():
+            raise CommandError(f"Файл не найден: {path}")
 
-        self.stdout.write(f"Загрузка ингредиентов из: {CSV_PATH}")
+        file_format = options["format"] or (
+            "json" if path.suffix.lower() == ".json" else "csv"
+        )
+        encoding = options["encoding"] or detect_encoding(path)
+        if encoding is None:
+            raise CommandError("Не удалось определить кодировку файла.")
+        self.stdout.write(
+            f"Загрузка ингредиентов из: {path} "
+            f"({file_format}, {encoding})"
+        )
 
-        rows = self._read_csv_with_fallback(CSV_PATH)
-        if rows is None:
-            self.stdout.write(
-                self.style.ERROR(
-                    "Не удалось прочитать CSV ни в одной из кодировок."
-                )
+        self.processed = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        with path.open("r", encoding=encoding, newline="") as f:
+            rows = (
+                iter_json_rows(f) if file_format == "json"
+                else iter_csv_rows(f)
             )
-            return
+            items = self._validated(rows)
+            with transaction.atomic():
+                if connection.vendor == "postgresql":
+                    created = self._load_with_copy(
+                        items, options["batch_size"]
+                    )
+                else:
+                    created = self._load_with_bulk_create(
+                        items, options["batch_size"]
+                    )
 
-        items = []
-        for row in rows:
-            if not row or len(row) < 2:
-                continue
-            name = (row[0] or "").strip()
-            measurement_unit = (row[1] or "").strip()
-            if not name or not measurement_unit:
-                continue
-            # Пропуск заголовка, если есть
-            if name.lower() == "name" and measurement_unit.lower() in {
-                "unit",
-                "measurement_unit",
-                "единица",
-            }:
-                continue
-            items.append(
-                Ingredient(name=name, measurement_unit=measurement_unit)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Успешно обработано строк: {self.processed}, "
+                f"создано записей: {created}, ошибок: {self.errors}"
             )
+        )
 
-        if not items:
-            self.stdout.write(
-                self.style.WARNING(
-                    "CSV файл пуст или не содержит валидных строк."
-                )
+    def _validated(self, rows):
+        """Проверка строк; ошибки выводятся с номером строки."""
+        try:
+            for line, name, measurement_unit in rows:
+                name = name.strip() if isinstance(name, str) else ""
+                if isinstance(measurement_unit, str):
+                    measurement_unit = measurement_unit.strip()
+                else:
+                    measurement_unit = ""
+                # Пропуск заголовка, если есть
+                if (
+                    name.lower() == "name"
+                    and measurement_unit.lower() in HEADER_UNITS
+                ):
+                    continue
+                error = self._row_error(name, measurement_unit)
+                if error:
+                    self._report_error(line, error)
+                    continue
+                self.processed += 1
+                yield name, measurement_unit
+        except (ValueError, csv.Error) as e:
+            raise CommandError(f"Ошибка разбора файла: {e}")
+
+    @staticmethod
+    def _row_error(name, measurement_unit):
+        if not name or not measurement_unit:
+            return "пустое название или единица измерения"
+        if "\x00" in name or "\x00" in measurement_unit:
+            return "недопустимый символ NUL"
+        if len(name) > INGREDIENT_NAME_MAX_LENGTH:
+            return f"название длиннее {INGREDIENT_NAME_MAX_LENGTH} символов"
+        if len(measurement_unit) > MEASUREMENT_UNIT_MAX_LENGTH:
+            return (
+                "единица измерения длиннее "
+                f"{MEASUREMENT_UNIT_MAX_LENGTH} символов"
             )
-            return
+        return None
 
-        created = Ingredient.objects.bulk_create(items, ignore_conflicts=True)
+    def _report_error(self, line, error):
+        self.errors += 1
+        if self.errors <= MAX_REPORTED_ERRORS:
+            self.stderr.write(f"Строка {line}: {error}")
+        elif self.errors == MAX_REPORTED_ERRORS + 1:
+            self.stderr.write("Дальнейшие ошибки не выводятся.")
+
+    def _report_progress(self):
+        elapsed = time.monotonic() - self.started
         self.stdout.write(
-            self.style.SUCCESS(
-                f"Успешно обработано строк: {len(items)}, "
-                f"создано записей: {len(created)}"
-            )
+            f"Обработано строк: {self.processed} "
+            f"({self.processed / max(elapsed, 1e-6):.0f} строк/с)"
         )
 
-    def _read_csv_with_fallback(self, path: Path):
-        for enc in ENCODINGS:
-            try:
-                with path.open("r", encoding=enc, newline="") as f:
-                    reader = csv.reader(f)
-                    return list(reader)
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"Проблема чтения с кодировкой {enc}: {e}"
-                    )
+    def _load_with_copy(self, items, batch_size):
+        """Загрузка через COPY во временную таблицу и слияние."""
+        table = Ingredient._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMPORARY TABLE ingredient_staging "
+                "(name text, measurement_unit text) ON COMMIT DROP"
+            )
+            while batch := list(islice(items, batch_size)):
+                copy_rows(
+                    cursor,
+                    "ingredient_staging",
+                    ("name", "measurement_unit"),
+                    batch,
                 )
-                continue
-        return None
+                self._report_progress()
+            cursor.execute(
+                f"INSERT INTO {table} (name, measurement_unit) "
+                "SELECT DISTINCT name, measurement_unit "
+                "FROM ingredient_staging "
+                "ON CONFLICT (name, measurement_unit) DO NOTHING"
+            )
+            return cursor.rowcount
+
+    def _load_with_bulk_create(self, items, batch_size):
+        """Загрузка пачками для баз данных без COPY."""
+        count_before = Ingredient.objects.count()
+        while batch := list(islice(items, batch_size)):
+            Ingredient.objects.bulk_create(
+                [
+                    Ingredient(name=name, measurement_unit=measurement_unit)
+                    for name, measurement_unit in batch
+                ],
+                ignore_conflicts=True,
+            )
+            self._report_progress()
+        return Ingredient.objects.count() - count_before
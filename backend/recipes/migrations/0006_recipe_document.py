@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_recipe_short_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='document',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Документ для чтения'),
+        ),
+    ]
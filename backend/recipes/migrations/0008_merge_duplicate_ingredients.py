@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:05
+
+from django.db import migrations
+from django.db.models import Count, Min, Sum
+
+# Верхняя граница PositiveSmallIntegerField в PostgreSQL
+MAX_AMOUNT = 32767
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    """Слияние дубликатов ингредиентов перед добавлением ограничения."""
+    Ingredient = apps.get_model("recipes", "Ingredient")
+    IngredientInRecipe = apps.get_model("recipes", "IngredientInRecipe")
+    Recipe = apps.get_model("recipes", "Recipe")
+    duplicates = (
+        Ingredient.objects.values("name", "measurement_unit")
+        .annotate(keep_id=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        extra_ids = list(
+            Ingredient.objects.filter(
+                name=duplicate["name"],
+                measurement_unit=duplicate["measurement_unit"],
+            )
+            .exclude(id=duplicate["keep_id"])
+            .values_list("id", flat=True)
+        )
+        # Рецепт с несколькими ингредиентами группы получает одну
+        # строку с суммой количеств, остальные строки удаляются.
+        group_ids = [duplicate["keep_id"], *extra_ids]
+        merged = (
+            IngredientInRecipe.objects.filter(ingredient_id__in=group_ids)
+            .values("recipe_id")
+            .annotate(total=Sum("amount"), rows=Count("id"))
+            .filter(rows__gt=1)
+        )
+        for row in merged.iterator():
+            rows = IngredientInRecipe.objects.filter(
+                recipe_id=row["recipe_id"], ingredient_id__in=group_ids
+            )
+            kept = (
+                rows.filter(ingredient_id=duplicate["keep_id"]).first()
+                or rows.order_by("id").first()
+            )
+            rows.exclude(pk=kept.pk).delete()
+            kept.ingredient_id = duplicate["keep_id"]
+            kept.amount = min(row["total"], MAX_AMOUNT)
+            kept.save(update_fields=("ingredient", "amount"))
+        IngredientInRecipe.objects.filter(
+            ingredient_id__in=extra_ids
+        ).update(ingredient_id=duplicate["keep_id"])
+        Ingredient.objects.filter(id__in=extra_ids).delete()
+        # Документы пересоберутся при следующем чтении
+        Recipe.objects.filter(
+            ingredient_amounts__ingredient_id=duplicate["keep_id"]
+        ).update(document={})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:20
+
+import core.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='favorite',
+            name='recipe',
+            field=models.ForeignKey(on_delete=core.deletion.DB_CASCADE, related_name='favorites', to='recipes.recipe', verbose_name='Рецепт'),
+        ),
+        migrations.AlterField(
+            model_name='favorite',
+            name='user',
+            field=models.ForeignKey(on_delete=core.deletion.DB_CASCADE, related_name='favorites', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AlterField(
+            model_name='ingredientinrecipe',
+            name='recipe',
+            field=models.ForeignKey(on_delete=core.deletion.DB_CASCADE, related_name='ingredient_amounts', to='recipes.recipe', verbose_name='Рецепт'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='author',
+            field=models.ForeignKey(on_delete=core.deletion.DB_CASCADE, related_name='recipes', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='shoppingcart',
+            name='recipe',
+            field=models.ForeignKey(on_delete=core.deletion.DB_CASCADE, related_name='shopping_cart', to='recipes.recipe', verbose_name='Рецепт'),
+        ),
+        migrations.AlterField(
+            model_name='shoppingcart',
+            name='user',
+            field=models.ForeignKey(on_delete=core.deletion.DB_CASCADE, related_name='shopping_cart', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        core.deletion.DatabaseCascade(
+            model_name='recipe',
+            name='author',
+        ),
+        core.deletion.DatabaseCascade(
+            model_name='recipe',
+            name='tags',
+        ),
+        core.deletion.DatabaseCascade(
+            model_name='ingredientinrecipe',
+            name='recipe',
+        ),
+        core.deletion.DatabaseCascade(
+            model_name='favorite',
+            name='user',
+        ),
+        core.deletion.DatabaseCascade(
+            model_name='favorite',
+            name='recipe',
+        ),
+        core.deletion.DatabaseCascade(
+            model_name='shoppingcart',
+            name='user',
+        ),
+        core.deletion.DatabaseCascade(
+            model_name='shoppingcart',
+            name='recipe',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_recipe_image_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='ingredientinrecipe',
+            options={'ordering': ('id',), 'verbose_name': 'Ингредиент в рецепте', 'verbose_name_plural': 'Ингредиенты в рецептах'},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_ingredientinrecipe_ordering'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='ingredientinrecipe',
+            name='unique_ingredient_in_recipe',
+        ),
+        migrations.RemoveIndex(
+            model_name='ingredientinrecipe',
+            name='ingredient_in_recipe_cover_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='ingredientinrecipe',
+            constraint=models.UniqueConstraint(fields=('recipe', 'ingredient'), include=('amount',), name='unique_ingredient_in_recipe'),
+        ),
+    ]
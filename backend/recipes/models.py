@@ -1,9 +1,12 @@
 import secrets
 import string
 
+from django.contrib.postgres.indexes import OpClass
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Cast, Upper
 
+from core.deletion import DB_CASCADE
 from users.models import User
 
 TAG_NAME_MAX_LENGTH = 32
@@ -59,8 +62,21 @@ class Ingredient(models.Model):
         verbose_name = "Ингредиент"
         verbose_name_plural = "Ингредиенты"
         ordering = ("name",)
-        models.UniqueConstraint(
-            fields=("name", "measurement_unit"), name="unique_ingredient"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("name", "measurement_unit"), name="unique_ingredient"
+            ),
+        )
+        indexes = (
+            # Поиск по началу названия: name__istartswith в PostgreSQL
+            # дает UPPER(name::text) LIKE 'X%'.
+            models.Index(
+                OpClass(
+                    Upper(Cast("name", output_field=models.TextField())),
+                    name="text_pattern_ops",
+                ),
+                name="ingredient_name_upper_idx",
+            ),
         )
 
     def __str__(self):
@@ -72,7 +88,7 @@ class Recipe(models.Model):
 
     author = models.ForeignKey(
         User,
-        on_delete=models.CASCADE,
+        on_delete=DB_CASCADE,
         related_name="recipes",
         verbose_name="Автор",
     )
@@ -117,6 +133,10 @@ class Recipe(models.Model):
         "Дата публикации",
         auto_now_add=True,
     )
+    updated_at = models.DateTimeField(
+        "Дата изменения",
+        auto_now=True,
+    )
 
     short_code = models.CharField(
         "Короткая ссылка",
@@ -124,11 +144,26 @@ class Recipe(models.Model):
         unique=True,
         blank=True,
     )
+    document = models.JSONField(
+        "Документ для чтения",
+        default=dict,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
         ordering = ("-pub_date",)
+        indexes = (
+            models.Index(fields=("-pub_date",), name="recipe_pub_date_idx"),
+            models.Index(
+                fields=("author", "-pub_date"),
+                name="recipe_author_pub_date_idx",
+            ),
+            # Проверка ссылок на файл перед удалением из хранилища.
+            models.Index(fields=("image",), name="recipe_image_idx"),
+        )
 
     def save(self, *args, **kwargs):
         if not self.short_code:
@@ -153,7 +188,7 @@ class IngredientInRecipe(models.Model):
 
     recipe = models.ForeignKey(
         Recipe,
-        on_delete=models.CASCADE,
+        on_delete=DB_CASCADE,
         related_name="ingredient_amounts",
         verbose_name="Рецепт",
     )
@@ -182,9 +217,13 @@ class IngredientInRecipe(models.Model):
     class Meta:
         verbose_name = "Ингредиент в рецепте"
         verbose_name_plural = "Ингредиенты в рецептах"
+        # Порядок добавления: так же их отдает документ рецепта.
+        ordering = ("id",)
         constraints = (
             models.UniqueConstraint(
                 fields=("recipe", "ingredient"),
+                # Список покупок суммирует amount без чтения таблицы.
+                include=("amount",),
                 name="unique_ingredient_in_recipe",
             ),
         )
@@ -198,13 +237,13 @@ class Favorite(models.Model):
 
     user = models.ForeignKey(
         User,
-        on_delete=models.CASCADE,
+        on_delete=DB_CASCADE,
         related_name="favorites",
         verbose_name="Пользователь",
     )
     recipe = models.ForeignKey(
         Recipe,
-        on_delete=models.CASCADE,
+        on_delete=DB_CASCADE,
         related_name="favorites",
         verbose_name="Рецепт",
     )
@@ -227,13 +266,13 @@ class ShoppingCart(models.Model):
 
     user = models.ForeignKey(
         User,
-        on_delete=models.CASCADE,
+        on_delete=DB_CASCADE,
         related_name="shopping_cart",
         verbose_name="Пользователь",
     )
     recipe = models.ForeignKey(
         Recipe,
-        on_delete=models.CASCADE,
+        on_delete=DB_CASCADE,
         related_name="shopping_cart",
         verbose_name="Рецепт",
     )
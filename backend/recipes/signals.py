@@ -0,0 +1,156 @@
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core.cache import invalidate
+from core.conditional import touch_relations
+from core.deletion import cascades_in_database
+from core.localcache import ingredients_cache, short_links_cache, tags_cache
+from recipes.jobs import (
+    delete_images,
+    refresh_documents,
+    refresh_related_documents,
+)
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from users.models import User
+
+# Поля пользователя, которые входят в документ рецепта
+AUTHOR_DOCUMENT_FIELDS = frozenset(
+    ("email", "username", "first_name", "last_name", "avatar")
+)
+# Поля с файлами: замененный файл удаляется из хранилища
+FILE_FIELDS = {Recipe: "image", User: "avatar"}
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    tags_cache.clear_on_commit()
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, instance, **kwargs):
+    ingredients_cache.clear_on_commit()
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, created, **kwargs):
+    if not created:
+        refresh_related_documents.enqueue(lookup="tags", pk=instance.pk)
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved(sender, instance, created, **kwargs):
+    if not created:
+        refresh_related_documents.enqueue(
+            lookup="ingredients", pk=instance.pk
+        )
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def tag_or_ingredient_deleting(sender, instance, **kwargs):
+    lookup = "tags" if sender is Tag else "ingredients"
+    instance._affected_recipe_ids = list(
+        Recipe.objects.filter(**{lookup: instance}).values_list(
+            "id", flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def tag_or_ingredient_deleted(sender, instance, **kwargs):
+    recipe_ids = getattr(instance, "_affected_recipe_ids", ())
+    if recipe_ids:
+        refresh_documents.enqueue(recipe_ids=recipe_ids)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    invalidate("recipes", f"recipe:{instance.pk}")
+    short_links_cache.delete_on_commit(instance.short_code)
+    if instance.image:
+        delete_images.enqueue(names=[instance.image.name])
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, update_fields, **kwargs):
+    if created:
+        return
+    if update_fields and not AUTHOR_DOCUMENT_FIELDS.intersection(
+        update_fields
+    ):
+        return
+    invalidate(f"user:{instance.pk}")
+    refresh_related_documents.enqueue(lookup="author", pk=instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def author_deleting(sender, instance, using, **kwargs):
+    # Рецепты удалит база без сигналов recipe_deleted: их данные
+    # читаются заранее одним узким запросом.
+    instance._deleted_recipes = (
+        list(
+            Recipe.objects.using(using)
+            .filter(author=instance)
+            .values_list("id", "short_code", "image")
+        )
+        if cascades_in_database(using) else []
+    )
+
+
+@receiver(post_delete, sender=User)
+def author_deleted(sender, instance, **kwargs):
+    recipes = getattr(instance, "_deleted_recipes", ())
+    invalidate(
+        "recipes",
+        f"user:{instance.pk}",
+        *(f"recipe:{pk}" for pk, _, _ in recipes),
+    )
+    if recipes:
+        short_links_cache.delete_on_commit(*(code for _, code, _ in recipes))
+    images = [image for _, _, image in recipes if image]
+    if instance.avatar:
+        images.append(instance.avatar.name)
+    if images:
+        delete_images.enqueue(names=images)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+def user_relation_changed(sender, instance, **kwargs):
+    touch_relations(instance.user_id)
+
+
+@receiver(pre_save, sender=Recipe)
+@receiver(pre_save, sender=User)
+def file_replacing(sender, instance, update_fields, using, **kwargs):
+    field = FILE_FIELDS[sender]
+    if instance._state.adding or (
+        update_fields and field not in update_fields
+    ):
+        return
+    old_name = (
+        sender._base_manager.using(using)
+        .filter(pk=instance.pk)
+        .values_list(field, flat=True)
+        .first()
+    )
+    if old_name and old_name != getattr(instance, field).name:
+        instance._replaced_file = old_name
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=User)
+def file_replaced(sender, instance, **kwargs):
+    name = instance.__dict__.pop("_replaced_file", None)
+    if name:
+        delete_images.enqueue(names=[name])
@@ -3,10 +3,9 @@ from django.db.models import F, Sum
 from recipes.models import Recipe
 
 
-def generate_shopping_list(user) -> str:
-    """Генерация списка покупок для пользователя."""
-
-    ingredients = (
+def shopping_list_ingredients(user):
+    """Суммарное количество ингредиентов из списка покупок."""
+    return (
         Recipe.objects.filter(shopping_cart__user=user)
         .values(
             ingredient_name=F("ingredient_amounts__ingredient__name"),
@@ -18,9 +17,13 @@ def generate_shopping_list(user) -> str:
         .order_by("ingredient_name", "ingredient_unit")
     )
 
+
+def generate_shopping_list(user) -> str:
+    """Генерация списка покупок для пользователя."""
+
     shopping_list = [
         f"{item['ingredient_name']} "
         f"({item['ingredient_unit']}) — {item['total']}"
-        for item in ingredients
+        for item in shopping_list_ingredients(user)
     ]
     return "\n".join(shopping_list)
@@ -1,11 +1,13 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
+from core.admin import AutocompleteFilter, ScalableAdminMixin, related_count
+from recipes.models import Recipe
 from users.models import Subscription, User
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(ScalableAdminMixin, BaseUserAdmin):
     """Админка для пользователей."""
 
     list_display = (
@@ -17,10 +19,9 @@ class UserAdmin(BaseUserAdmin):
         "get_recipes_count",
     )
     list_filter = (
-        "email",
-        "username",
         "is_staff",
         "is_superuser",
+        "is_active",
     )
     search_fields = (
         "email",
@@ -30,15 +31,20 @@ class UserAdmin(BaseUserAdmin):
     )
     readonly_fields = ("date_joined", "last_login")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            recipes_count=related_count(Recipe.objects, "author")
+        )
+
     def get_recipes_count(self, obj):
         """Количество рецептов пользователя."""
-        return obj.recipes.count()
+        return obj.recipes_count
 
     get_recipes_count.short_description = "Рецептов"
 
 
 @admin.register(Subscription)
-class SubscriptionAdmin(admin.ModelAdmin):
+class SubscriptionAdmin(ScalableAdminMixin, admin.ModelAdmin):
     """Админка для подписок."""
 
     list_display = (
@@ -48,18 +54,27 @@ class SubscriptionAdmin(admin.ModelAdmin):
         "get_author_recipes_count",
     )
     list_filter = (
-        "user",
-        "author",
+        ("user", AutocompleteFilter),
+        ("author", AutocompleteFilter),
     )
+    list_select_related = ("user", "author")
     search_fields = (
         "user__username",
         "user__email",
         "author__username",
         "author__email",
     )
+    autocomplete_fields = ("user", "author")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            author_recipes_count=related_count(
+                Recipe.objects, "author", outer="author"
+            )
+        )
 
     def get_author_recipes_count(self, obj):
         """Количество рецептов автора."""
-        return obj.author.recipes.count()
+        return obj.author_recipes_count
 
     get_author_recipes_count.short_description = "Рецептов у автора"
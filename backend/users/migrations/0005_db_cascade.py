@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:20
+
+import core.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='subscription',
+            name='author',
+            field=models.ForeignKey(on_delete=core.deletion.DB_CASCADE, related_name='subscribers', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='subscription',
+            name='user',
+            field=models.ForeignKey(on_delete=core.deletion.DB_CASCADE, related_name='subscriptions', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик'),
+        ),
+        core.deletion.DatabaseCascade(
+            model_name='subscription',
+            name='user',
+        ),
+        core.deletion.DatabaseCascade(
+            model_name='subscription',
+            name='author',
+        ),
+    ]
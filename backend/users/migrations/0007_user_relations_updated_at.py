@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_avatar_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='relations_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Дата изменения избранного, покупок и подписок'),
+        ),
+    ]
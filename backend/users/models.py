@@ -1,5 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
+
+from core.deletion import DB_CASCADE
 
 NAME_MAX_LENGTH = 150
 
@@ -25,6 +28,15 @@ class User(AbstractUser):
         blank=True,
         null=True,
     )
+    updated_at = models.DateTimeField(
+        "Дата изменения",
+        auto_now=True,
+    )
+    relations_updated_at = models.DateTimeField(
+        "Дата изменения избранного, покупок и подписок",
+        default=timezone.now,
+        editable=False,
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ("username", "first_name", "last_name")
@@ -33,6 +45,10 @@ class User(AbstractUser):
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
         ordering = ("username",)
+        indexes = (
+            # Проверка ссылок на файл перед удалением из хранилища.
+            models.Index(fields=("avatar",), name="user_avatar_idx"),
+        )
 
     def __str__(self):
         return self.username
@@ -43,13 +59,13 @@ class Subscription(models.Model):
 
     user = models.ForeignKey(
         User,
-        on_delete=models.CASCADE,
+        on_delete=DB_CASCADE,
         related_name="subscriptions",
         verbose_name="Подписчик",
     )
     author = models.ForeignKey(
         User,
-        on_delete=models.CASCADE,
+        on_delete=DB_CASCADE,
         related_name="subscribers",
         verbose_name="Автор",
     )
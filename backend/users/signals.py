@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.conditional import touch_relations
+from core.localcache import tokens_cache
+from users.models import Subscription, User
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def subscription_changed(sender, instance, **kwargs):
+    touch_relations(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    # Вход обновляет только last_login: кэш токенов он не задевает.
+    if created or update_fields == {"last_login"}:
+        return
+    keys = Token.objects.filter(user=instance).values_list("key", flat=True)
+    if keys:
+        tokens_cache.delete_on_commit(*keys)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_changed(sender, instance, **kwargs):
+    tokens_cache.delete_on_commit(instance.key)